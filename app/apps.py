@@ -1,6 +1,39 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, pre_delete
+
+
+def install_search_index(sender, using, **kwargs):
+    # En SQLite, las migraciones que reconstruyen app_event borran los triggers del indice
+    from django.db import connections
+
+    from . import event_search
+
+    event_search.install(connections[using])
+
+
+def release_user_counters(sender, instance, **kwargs):
+    instance.release_event_counters()
 
 
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        from . import reference_cache
+        from .database import apply_sqlite_pragmas
+        from .models import Category, User, Venue
+
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="eventhub-sqlite-pragmas")
+        reference_cache.invalidate_on_change(Category, "categories")
+        reference_cache.invalidate_on_change(Venue, "venues")
+        pre_delete.connect(release_user_counters, sender=User, dispatch_uid="eventhub-user-counters")
+
+        if getattr(settings, "SCHEDULER_IN_PROCESS", False):
+            from .scheduler import start_in_process
+
+            request_started.connect(start_in_process, dispatch_uid="eventhub-scheduler")
@@ -0,0 +1,144 @@
+"""Configuracion del cache de Django y medicion de aciertos.
+
+parse_cache_url arma la entrada de CACHES a partir de CACHE_URL, igual que
+parse_database_url con la base:
+
+- locmem:// (por defecto): memoria de cada proceso. Sirve con un solo proceso y en los
+  tests, no se comparte entre workers.
+- file:///cache (relativo al directorio actual) o file:////var/cache/eventhub (absoluto):
+  archivos en un directorio, compartido por los procesos de una maquina.
+- redis://host:6379/0 o rediss:// (con TLS): Redis o un servidor compatible (Valkey,
+  KeyDB), compartido por todas las maquinas. Hace falta pip install redis.
+- dummy://: no guarda nada.
+
+Las claves de la app van como "<espacio>:<resto>" (event_facets:..., reference:...,
+waiting_room:...). Django les agrega delante CACHE_KEY_PREFIX y CACHE_VERSION, asi que
+dos instalaciones pueden compartir un Redis, y subir CACHE_VERSION descarta todo lo
+guardado (por ejemplo si cambia el formato de lo que se guarda).
+
+Los backends de este modulo cuentan cada lectura como acierto o fallo por espacio de
+claves en el registro de metricas (eventhub_cache_requests_total); el comando
+cache_stats los muestra.
+"""
+import os
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.cache.backends import dummy, filebased, locmem, redis
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import registry
+
+BACKENDS = {
+    "locmem": "app.caching.LocMemCache",
+    "file": "app.caching.FileBasedCache",
+    "redis": "app.caching.RedisCache",
+    "rediss": "app.caching.RedisCache",
+    "dummy": "app.caching.DummyCache",
+}
+
+_MISSING = object()
+
+
+def parse_cache_url(url, key_prefix="", version=1, timeout=300):
+    """Entrada de CACHES para una URL como las del docstring del modulo. En locmem y file
+    los parametros de la URL van a OPTIONS (?max_entries=10000&cull_frequency=3); en
+    Redis quedan en la URL, que la lee el cliente."""
+    parsed = urlsplit(url)
+    backend = BACKENDS.get(parsed.scheme)
+    if backend is None:
+        raise ImproperlyConfigured(f"CACHE_URL no soportada: {parsed.scheme or url!r}")
+
+    config = {
+        "BACKEND": backend,
+        "KEY_PREFIX": key_prefix,
+        "VERSION": version,
+        "TIMEOUT": timeout,
+    }
+    if parsed.scheme in ("redis", "rediss"):
+        config["LOCATION"] = url
+        return config
+
+    options = {name: int(value) if value.isdigit() else value for name, value in parse_qsl(parsed.query)}
+    if options:
+        config["OPTIONS"] = options
+    if parsed.scheme == "file":
+        location = unquote(parsed.path[1:])
+        if not location:
+            raise ImproperlyConfigured("CACHE_URL file:// necesita un directorio")
+        config["LOCATION"] = location
+    elif parsed.scheme == "locmem":
+        config["LOCATION"] = unquote(parsed.netloc) or "eventhub"
+    return config
+
+
+def key_namespace(key):
+    """Espacio de una clave de la app: lo que va antes del primer ":" """
+    namespace, separator, _ = str(key).partition(":")
+    return namespace if separator else "otros"
+
+
+def _record(namespace, hits, misses):
+    if hits:
+        registry.inc("eventhub_cache_requests_total", (("namespace", namespace), ("result", "hit")), hits)
+    if misses:
+        registry.inc("eventhub_cache_requests_total", (("namespace", namespace), ("result", "miss")), misses)
+
+
+class InstrumentedCache:
+    """Cuenta los aciertos y fallos de get. get_or_set y el get_many de BaseCache pasan
+    por get; el backend que tiene su propio get_many lo cuenta aparte"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        _record(key_namespace(key), int(hit), int(not hit))
+        return value if hit else default
+
+    def entry_count(self):
+        """Claves guardadas, o None si el backend no lo sabe"""
+        return None
+
+
+class LocMemCache(InstrumentedCache, locmem.LocMemCache):
+    def entry_count(self):
+        with self._lock:
+            return len(self._cache)
+
+
+class FileBasedCache(InstrumentedCache, filebased.FileBasedCache):
+    def entry_count(self):
+        return len(self._list_cache_files()) if os.path.isdir(self._dir) else 0
+
+
+class RedisCache(InstrumentedCache, redis.RedisCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        for key in keys:
+            hit = key in found
+            _record(key_namespace(key), int(hit), int(not hit))
+        return found
+
+    def entry_count(self):
+        # Toda la base de Redis, que puede tener claves de otras instalaciones
+        return self._cache.get_client().dbsize()
+
+
+class DummyCache(InstrumentedCache, dummy.DummyCache):
+    pass
+
+
+def hit_stats(values):
+    """{espacio: (aciertos, fallos)} a partir de los valores de metrics.collect()"""
+    stats = {}
+    for (name, labels), value in values.items():
+        if name != "eventhub_cache_requests_total":
+            continue
+        labels = dict(labels)
+        hits, misses = stats.get(labels["namespace"], (0, 0))
+        if labels["result"] == "hit":
+            hits += int(value)
+        else:
+            misses += int(value)
+        stats[labels["namespace"]] = (hits, misses)
+    return stats
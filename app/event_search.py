@@ -0,0 +1,142 @@
+"""Busqueda de texto completo sobre el titulo y la descripcion de los eventos.
+
+En SQLite se usa una tabla FTS5 (app_event_fts) con contenido externo: guarda solo el
+indice y lee el texto de app_event. Se mantiene sincronizada con triggers, asi que
+tambien cubre bulk_create y los UPDATE directos. En Postgres se usa un indice GIN
+sobre to_tsvector(titulo || descripcion). En otras bases se cae a icontains.
+
+search() agrega a un queryset de eventos el filtro y la anotacion search_rank
+(menor es mejor en todas las bases), para ordenar por relevancia.
+"""
+import re
+
+from django.db import connection, models
+from django.db.models import Lookup, Q, Value
+
+FTS_TABLE = "app_event_fts"
+POSTGRES_CONFIG = "spanish"
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='app_event', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON app_event BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON app_event BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    # Solo cuando cambia el texto: los contadores de entradas se actualizan seguido
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON app_event BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+# Tiene que ser la misma expresion que arma SearchVector("title", "description") para
+# que Postgres use el indice
+POSTGRES_SCHEMA = [
+    f"""CREATE INDEX IF NOT EXISTS app_event_search_idx ON app_event USING GIN (
+        to_tsvector('{POSTGRES_CONFIG}'::regconfig,
+            COALESCE("title", '') || ' ' || COALESCE("description", ''))
+    )""",
+]
+
+DROP_SCHEMA = {
+    "sqlite": [
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    ],
+    "postgresql": ["DROP INDEX IF EXISTS app_event_search_idx"],
+}
+
+
+class SearchDocumentField(models.TextField):
+    """Columna oculta de FTS5 con el nombre de la tabla, sobre la que se hace MATCH"""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+def install(conn=None):
+    """Crea el indice de busqueda y los triggers si no existen. Se llama despues de cada
+    migrate, porque en SQLite las migraciones que reconstruyen app_event borran los
+    triggers."""
+    conn = conn or connection
+    statements = {"sqlite": SQLITE_SCHEMA, "postgresql": POSTGRES_SCHEMA}.get(conn.vendor, [])
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        for statement in DROP_SCHEMA.get(conn.vendor, []):
+            cursor.execute(statement)
+
+
+def rebuild(conn=None):
+    """Recrea el indice desde app_event. Devuelve la cantidad de eventos indexados"""
+    conn = conn or connection
+    install(conn)
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif conn.vendor == "postgresql":
+            cursor.execute("REINDEX INDEX app_event_search_idx")
+        cursor.execute("SELECT COUNT(*) FROM app_event")
+        return cursor.fetchone()[0]
+
+
+def words(text):
+    """Palabras del texto de busqueda, sin signos ni operadores"""
+    return re.findall(r"\w+", text or "")
+
+
+def fts_query(text):
+    """Arma una consulta FTS5 segura con el texto del usuario: todas las palabras,
+    cada una como prefijo ("roc" encuentra "rock")"""
+    return " ".join('"{}"*'.format(word) for word in words(text))
+
+
+def search(queryset, text):
+    """Filtra el queryset de eventos a los que coinciden con text y anota search_rank.
+
+    Si el texto no tiene palabras devuelve el queryset sin cambios."""
+    if not words(text):
+        return queryset
+
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        return queryset.filter(search_document__document__match=fts_query(text)).annotate(
+            search_rank=models.F("search_document__rank")
+        )
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector("title", "description", config=POSTGRES_CONFIG)
+        query = SearchQuery(text, config=POSTGRES_CONFIG, search_type="websearch")
+        return queryset.annotate(search_vector=vector).filter(search_vector=query).annotate(
+            search_rank=SearchRank(vector, query) * Value(-1.0)
+        )
+
+    condition = Q()
+    for word in words(text):
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=models.FloatField())
+    )
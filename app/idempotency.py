@@ -0,0 +1,62 @@
+"""Claves de idempotencia para los POST que crean o modifican compras.
+
+El cliente manda la clave en el header Idempotency-Key o en el campo de formulario
+idempotency_key (ver el tag {% idempotency_key %}). El primer request con esa clave
+se procesa y su respuesta se guarda; los duplicados reciben la misma respuesta sin
+volver a ejecutar la vista.
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.http import HttpResponse, HttpResponseRedirect
+
+from .models import IdempotencyKey
+
+FORM_FIELD = "idempotency_key"
+
+
+def _is_final(response):
+    """Se guardan las redirecciones (compra hecha) y las respuestas JSON. Un HTML con
+    el formulario y sus errores no se guarda, para poder corregir y reintentar."""
+    if 300 <= response.status_code < 400:
+        return True
+    return response.get("Content-Type", "").startswith("application/json")
+
+
+def _replay(record):
+    if record.location:
+        response = HttpResponseRedirect(record.location)
+        response.status_code = record.status_code
+    else:
+        response = HttpResponse(record.body, status=record.status_code, content_type=record.content_type)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key") or request.POST.get(FORM_FIELD)
+        if request.method != "POST" or not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        record, claimed = IdempotencyKey.claim(request.user, key[:64])
+        if not claimed:
+            if record is not None and record.is_completed:
+                messages.info(request, "Esta operación ya se había procesado.")
+                return _replay(record)
+            return HttpResponse("La operación con esta clave todavía se está procesando.", status=409)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if _is_final(response):
+            record.complete(response)
+        else:
+            record.delete()
+        return response
+
+    return wrapper
@@ -0,0 +1,9 @@
+"""Pruebas de carga de las vistas principales contra un servidor local.
+
+- scenarios: recorridos de un usuario (navegar, comprar) como secuencias de requests.
+- runner: corre los escenarios con varios usuarios virtuales durante un tiempo y
+  devuelve throughput y p50/p95/p99 por escenario y por paso.
+
+Los datos se generan antes con python manage.py seed (ver app/seed.py) y la
+prueba se corre con python manage.py loadtest.
+"""
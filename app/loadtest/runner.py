@@ -0,0 +1,214 @@
+"""Corre los escenarios contra un servidor y junta las mediciones.
+
+Cada usuario virtual es un thread con su propia sesion (cookies) que inicia sesion y
+repite escenarios elegidos al azar hasta que se termina el tiempo. Cada thread guarda
+sus mediciones en sus propias listas, asi que medir no agrega contencion.
+"""
+import http.cookiejar
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from app.seed import PASSWORD, PREFIX
+
+from .scenarios import SCENARIOS
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Las redirecciones se devuelven tal cual, para medir cada request por separado"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    """Cliente HTTP de un usuario virtual. Registra cada request en recorder"""
+
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def _csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == "csrftoken"), "")
+
+    def request(self, step, method, path, fields=None):
+        """Devuelve (status, html). Un error de conexion cuenta como status 0"""
+        url = self.base_url + path
+        body = None
+        headers = {}
+        if fields is not None:
+            body = urllib.parse.urlencode({**fields, "csrfmiddlewaretoken": self._csrf_token()}).encode()
+            headers = {"Content-Type": "application/x-www-form-urlencoded", "Referer": url}
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            status, content = 0, b""
+        self.recorder.request(step, time.perf_counter() - start, status)
+        return status, content.decode("utf-8", "replace")
+
+    def get(self, step, path):
+        return self.request(step, "GET", path)[1]
+
+    def post(self, step, path, fields):
+        return self.request(step, "POST", path, fields)[0]
+
+    def login(self, username, password):
+        self.get("login_form", "/accounts/login/")
+        return self.post("login", "/accounts/login/", {"username": username, "password": password}) == 302
+
+
+class Recorder:
+    """Mediciones de un usuario virtual"""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.iterations = defaultdict(list)
+        self.failed_iterations = defaultdict(int)
+
+    def request(self, step, seconds, status):
+        self.requests[step].append(seconds)
+        if status == 0 or status >= 400:
+            self.errors[step] += 1
+
+    def iteration(self, scenario, seconds, failed=False):
+        self.iterations[scenario].append(seconds)
+        if failed:
+            self.failed_iterations[scenario] += 1
+
+
+def percentile(samples, percent):
+    """Percentil por rango mas cercano de una lista ordenada"""
+    if not samples:
+        return None
+    return samples[max(0, math.ceil(percent / 100 * len(samples)) - 1)]
+
+
+def summarize(samples, errors, duration):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "throughput": round(len(samples) / duration, 2) if duration else None,
+        "p50_ms": _ms(percentile(samples, 50)),
+        "p95_ms": _ms(percentile(samples, 95)),
+        "p99_ms": _ms(percentile(samples, 99)),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _virtual_user(number, base_url, scenarios, deadline, seed, recorder):
+    rng = random.Random(seed * 1_000 + number)
+    session = Session(base_url, recorder)
+    # Si no puede iniciar sesion el error queda registrado en el paso login
+    if not session.login(f"{PREFIX}{number}", PASSWORD):
+        return
+    while time.monotonic() < deadline:
+        name = rng.choice(scenarios)
+        errors_before = sum(recorder.errors.values())
+        start = time.perf_counter()
+        try:
+            SCENARIOS[name](session, rng)
+            failed = sum(recorder.errors.values()) > errors_before
+        except Exception:
+            failed = True
+        recorder.iteration(name, time.perf_counter() - start, failed)
+
+
+def run(base_url, scenarios=("browse", "buy"), users=10, duration=30, seed=1):
+    """Corre los escenarios con users usuarios virtuales (seed0, seed1, ...)
+    durante duration segundos. Devuelve el resultado como diccionario."""
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+    recorders = [Recorder() for _ in range(users)]
+    started_at = datetime.now(timezone.utc)
+    start = time.monotonic()
+    threads = [
+        threading.Thread(
+            target=_virtual_user,
+            args=(number, base_url, list(scenarios), start + duration, seed, recorder),
+            daemon=True,
+        )
+        for number, recorder in enumerate(recorders)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    iterations, failed, requests, errors = defaultdict(list), defaultdict(int), defaultdict(list), defaultdict(int)
+    for recorder in recorders:
+        for name, samples in recorder.iterations.items():
+            iterations[name].extend(samples)
+        for name, count in recorder.failed_iterations.items():
+            failed[name] += count
+        for step, samples in recorder.requests.items():
+            requests[step].extend(samples)
+        for step, count in recorder.errors.items():
+            errors[step] += count
+
+    return {
+        "commit": current_commit(),
+        "started_at": started_at.isoformat(),
+        "base_url": base_url,
+        "users": users,
+        "duration": round(elapsed, 2),
+        "seed": seed,
+        "scenarios": {name: summarize(samples, failed[name], elapsed) for name, samples in sorted(iterations.items())},
+        "steps": {step: summarize(samples, errors[step], elapsed) for step, samples in sorted(requests.items())},
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(previous, current):
+    """Lineas con la variacion de p95 y throughput de cada escenario y paso"""
+    lines = []
+    for section in ("scenarios", "steps"):
+        for name, now in current[section].items():
+            before = previous.get(section, {}).get(name)
+            if not before or not before.get("p95_ms") or now["p95_ms"] is None:
+                continue
+            change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            lines.append(
+                f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms ({change:+.1f}%), "
+                f"throughput {before['throughput']} -> {now['throughput']}/s"
+            )
+    return lines
+
+
+def save(result, path):
+    with open(path, "w") as file:
+        json.dump(result, file, indent=2)
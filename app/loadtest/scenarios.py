@@ -0,0 +1,51 @@
+"""Recorridos de un usuario. Cada escenario recibe la sesion HTTP del usuario virtual
+y un generador aleatorio, y hace sus requests con nombres de paso (para medir cada
+vista por separado). session.get devuelve el HTML y session.post el status."""
+import re
+import uuid
+from html import unescape
+
+from app.idempotency import FORM_FIELD
+
+EVENT_LINK = re.compile(r'href="/events/(\d+)/"')
+NEXT_PAGE = re.compile(r'href="\?[^"]*after=([^"&]+)"')
+TICKET_DELETE_LINK = re.compile(r'href="/ticket/(\d+)/delete/"')
+
+
+def browse(session, rng):
+    """Listado, pagina siguiente, detalle de un evento y mis tickets"""
+    body = session.get("events", "/events/")
+    next_page = NEXT_PAGE.search(body)
+    if next_page:
+        session.get("events_next_page", f"/events/?after={unescape(next_page.group(1))}")
+    event_ids = EVENT_LINK.findall(body)
+    if event_ids:
+        session.get("event_detail", f"/events/{rng.choice(event_ids)}/")
+    session.get("ticket_list", "/tickets/")
+
+
+def buy(session, rng):
+    """Compra una entrada de un evento disponible y la devuelve, para que el cupo y el
+    maximo por usuario no se agoten durante la prueba"""
+    event_ids = EVENT_LINK.findall(session.get("events", "/events/?state=AVAILABLE"))
+    if not event_ids:
+        return
+    event_id = rng.choice(event_ids)
+    session.get("ticket_form", f"/ticket/create/{event_id}")
+    status = session.post(
+        "ticket_purchase",
+        f"/ticket/create/{event_id}",
+        {"event_id": event_id, "type": "GENERAL", "quantity": 1, FORM_FIELD: uuid.uuid4().hex},
+    )
+    # Si la compra no se hizo (cupo, maximo por usuario) el formulario vuelve con 200
+    if status != 302:
+        return
+    ticket_ids = TICKET_DELETE_LINK.findall(session.get("ticket_list", "/tickets/"))
+    if ticket_ids:
+        session.post("ticket_delete", f"/ticket/{max(ticket_ids, key=int)}/delete/", {})
+
+
+SCENARIOS = {
+    "browse": browse,
+    "buy": buy,
+}
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import ArchivedEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve al archivo los eventos finalizados hace mas de --days dias, con sus "
+        "tickets, comentarios y calificaciones. Si se corta se puede volver a correr."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ARCHIVE_FINISHED_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        archived = ArchivedEvent.archive_finished(before=before, batch_size=options["batch_size"])
+        self.stdout.write(f"Eventos archivados: {archived}")
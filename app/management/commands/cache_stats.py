@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+from app import metrics
+from app.caching import hit_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra la configuracion del cache, cuantas claves tiene guardadas y los aciertos "
+        "y fallos por espacio de claves de todos los workers, que lee de los archivos de "
+        "METRICS_MULTIPROC_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alias", default="default", choices=sorted(settings.CACHES))
+
+    def handle(self, *args, **options):
+        # Este comando corre en un proceso aparte: sus propios contadores estan vacios y
+        # los de los workers solo estan en los archivos del directorio compartido
+        store = metrics.get_store()
+        if store is None:
+            raise CommandError(
+                "Los aciertos del cache se leen de METRICS_MULTIPROC_DIR: definilo con el mismo "
+                "directorio que usan los workers (y METRICS_ENABLED=True)."
+            )
+
+        config = settings.CACHES[options["alias"]]
+        cache = caches[options["alias"]]
+        self.stdout.write(f"Backend: {config['BACKEND']}")
+        if config.get("LOCATION"):
+            self.stdout.write(f"Ubicacion: {config['LOCATION']}")
+        self.stdout.write(
+            f"Prefijo: {config.get('KEY_PREFIX') or '-'}, version {config.get('VERSION', 1)}, "
+            f"vencimiento {config.get('TIMEOUT', 300)}s"
+        )
+
+        try:
+            entries = getattr(cache, "entry_count", lambda: None)()
+        except Exception as e:
+            # Por ejemplo Redis caido o sin el paquete redis instalado
+            self.stdout.write(self.style.WARNING(f"No se pudo contar las claves: {e}"))
+        else:
+            self.stdout.write(f"Claves guardadas: {'desconocido' if entries is None else entries}")
+
+        # collect y no metrics.collect(), que dejaria en el directorio un archivo de este proceso
+        stats = hit_stats(store.collect({}))
+        if not stats:
+            self.stdout.write("Sin lecturas registradas")
+            return
+        for namespace, (hits, misses) in sorted(stats.items()):
+            self.stdout.write(
+                f"{namespace}: {hits} aciertos, {misses} fallos ({hits / (hits + misses):.1%} de aciertos)"
+            )
@@ -0,0 +1,39 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Event, Ticket
+
+
+class Command(BaseCommand):
+    help = "Emite tickets en cantidad para un evento desde un CSV con filas username,tipo,cantidad"
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id", type=int)
+        parser.add_argument("csv_file", help="Ruta al CSV, o - para leer de la entrada estandar")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options["event_id"])
+        except Event.DoesNotExist:
+            raise CommandError(f"No existe el evento {options['event_id']}")
+
+        if options["csv_file"] == "-":
+            rows = list(csv.reader(sys.stdin))
+        else:
+            with open(options["csv_file"], newline="", encoding="utf-8") as csv_file:
+                rows = list(csv.reader(csv_file))
+
+        results = Ticket.issue_bulk(event, rows, batch_size=options["batch_size"])
+
+        issued = 0
+        for line, result in enumerate(results, start=1):
+            if result["error"]:
+                self.stderr.write(f"Fila {line} ({result['username']}): {result['error']}")
+            else:
+                issued += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Tickets emitidos: {issued}. Filas con error: {len(results) - issued}")
+        )
@@ -0,0 +1,59 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from app.loadtest import runner
+from app.loadtest.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Pruebas de carga: corre los escenarios contra un servidor ya levantado (con datos "
+        "generados por el comando seed) y guarda el resultado en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Se puede repetir. Por defecto todos",
+        )
+        parser.add_argument("--users", type=int, default=10, help="Usuarios virtuales en paralelo")
+        parser.add_argument("--duration", type=float, default=30, help="Segundos")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", default="loadtest-results", help="Directorio o archivo .json")
+        parser.add_argument("--compare", help="Resultado anterior (JSON) para comparar")
+
+    def handle(self, *args, **options):
+        scenarios = options["scenario"] or sorted(SCENARIOS)
+        result = runner.run(
+            options["base_url"],
+            scenarios=scenarios,
+            users=options["users"],
+            duration=options["duration"],
+            seed=options["seed"],
+        )
+
+        for section in ("scenarios", "steps"):
+            for name, summary in result[section].items():
+                self.stdout.write(
+                    f"{name}: {summary['count']} ({summary['throughput']}/s, {summary['errors']} errores) "
+                    f"p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms"
+                )
+
+        path = options["output"]
+        if not path.endswith(".json"):
+            os.makedirs(path, exist_ok=True)
+            stamp = result["started_at"][:19].replace(":", "").replace("-", "")
+            path = os.path.join(path, f"{stamp}-{result['commit'] or 'sin-commit'}.json")
+        runner.save(result, path)
+        self.stdout.write(self.style.SUCCESS(f"Resultado guardado en {path}"))
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                previous = json.load(file)
+            for line in runner.compare(previous, result):
+                self.stdout.write(line)
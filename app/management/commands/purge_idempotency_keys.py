@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Borra las claves de idempotencia vencidas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        purged = IdempotencyKey.purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(f"Claves de idempotencia borradas: {purged}")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from app import event_search
+
+
+class Command(BaseCommand):
+    help = "Recrea el indice de busqueda de texto de los eventos a partir de la tabla de eventos"
+
+    def handle(self, *args, **options):
+        indexed = event_search.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f"Indice de busqueda recreado. Eventos indexados: {indexed}"))
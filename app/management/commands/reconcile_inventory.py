@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de entradas vendidas de cada evento a partir de los tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            type=int,
+            action="append",
+            dest="events",
+            help="Id de evento a reconciliar (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options["events"]:
+            events = events.filter(pk__in=options["events"])
+
+        drifted = Event.reconcile_inventory(events)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Contadores reconciliados. Eventos corregidos: {drifted}")
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el resumen de calificaciones (cantidad, suma, promedio y distribucion) "
+        "de cada evento a partir de los ratings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            type=int,
+            action="append",
+            dest="events",
+            help="Id de evento a reconciliar (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options["events"]:
+            events = events.filter(pk__in=options["events"])
+
+        drifted = Event.reconcile_ratings(events)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Calificaciones reconciliadas. Eventos corregidos: {drifted}")
+        )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.models import TicketHold
+
+
+class Command(BaseCommand):
+    help = "Libera las reservas de entradas vencidas y devuelve su cupo a los eventos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Queda corriendo y barre cada --interval segundos",
+        )
+        parser.add_argument("--interval", type=float, default=30)
+
+    def handle(self, *args, **options):
+        while True:
+            released = TicketHold.release_expired(batch_size=options["batch_size"])
+            self.stdout.write(f"Reservas liberadas: {released}")
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
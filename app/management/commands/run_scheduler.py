@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app import scheduler
+from app.models import ScheduledJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Corre las tareas periodicas pendientes (finalizar eventos pasados, liberar "
+        "reservas vencidas). Es seguro correrlo en varios workers a la vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Queda corriendo y revisa las tareas cada --interval segundos",
+        )
+        parser.add_argument("--interval", type=float, default=15)
+
+    def handle(self, *args, **options):
+        while True:
+            for name, result in scheduler.run_pending().items():
+                job = ScheduledJob.objects.get(name=name)
+                self.stdout.write(
+                    f"{name}: {result} filas en {job.last_duration_ms}ms "
+                    f"(corridas: {job.runs}, total: {job.total_result}, fallas: {job.failures})"
+                )
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,302 @@
+"""Metricas de los requests en formato de texto de Prometheus (GET /metrics).
+
+MetricsMiddleware mide por nombre de URL la latencia (histograma), la cantidad de
+requests por metodo y status, las consultas SQL y su tiempo, y el tiempo de render de
+los templates (con el backend InstrumentedDjangoTemplates).
+
+Los valores se acumulan en un diccionario por thread, asi que registrar una medicion
+no toma ningun lock; el endpoint suma los de todos los threads. Con varios procesos
+(gunicorn) cada uno vuelca sus totales cada METRICS_FLUSH_SECONDS a un archivo en
+METRICS_MULTIPROC_DIR y el endpoint suma los archivos de todos los procesos.
+
+Todo esto se activa con METRICS_ENABLED. El endpoint solo lo ven los usuarios staff o
+quien mande el header Authorization: Bearer <METRICS_TOKEN>.
+"""
+import atexit
+import contextvars
+import hmac
+import json
+import math
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates
+
+from .query_budget import record_queries
+
+# Los templates se renderizan dentro de la vista; el middleware deja aca donde sumar
+_render_time = contextvars.ContextVar("metrics_render_time", default=None)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+
+METRICS = {
+    "eventhub_http_requests_total": ("counter", "Requests atendidos por vista, metodo y status"),
+    "eventhub_http_request_duration_seconds": ("histogram", "Latencia de los requests por vista"),
+    "eventhub_db_queries_total": ("counter", "Consultas SQL ejecutadas por vista"),
+    "eventhub_db_query_duration_seconds_total": ("counter", "Tiempo total en consultas SQL por vista"),
+    "eventhub_template_render_duration_seconds": ("histogram", "Tiempo de render de templates por vista"),
+    "eventhub_cache_requests_total": ("counter", "Lecturas del cache por espacio de claves y resultado (hit o miss)"),
+}
+
+
+class Registry:
+    """Contadores por thread (sin locks al registrar) que se suman al exportar.
+
+    Las claves son (nombre, ((label, valor), ...)); los histogramas guardan sus
+    buckets acumulados, _sum y _count como contadores. Los valores de los threads que
+    terminaron se pasan a un total aparte, asi no se acumulan diccionarios."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = defaultdict(float)
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def inc(self, name, labels, amount=1):
+        self._shard()[(name, labels)] += amount
+
+    def observe(self, name, labels, value):
+        shard = self._shard()
+        for bound in BUCKETS:
+            if value <= bound:
+                shard[(f"{name}_bucket", labels + (("le", _format_bound(bound)),))] += 1
+        shard[(f"{name}_sum", labels)] += value
+        shard[(f"{name}_count", labels)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    for key, value in shard.items():
+                        self._retired[key] += value
+            self._shards = alive
+            totals = defaultdict(float, self._retired)
+        for _, shard in alive:
+            # dict() copia el diccionario de una vez, aunque otro thread lo este actualizando
+            for key, value in dict(shard).items():
+                totals[key] += value
+        return totals
+
+    def clear(self):
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+registry = Registry()
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+class FileStore:
+    """Totales de cada proceso en un archivo JSON propio dentro de directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}.json")
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def flush(self, force=False):
+        """Escribe los totales del proceso, como mucho una vez cada METRICS_FLUSH_SECONDS"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < getattr(settings, "METRICS_FLUSH_SECONDS", 5):
+            return
+        if not self._lock.acquire(blocking=force):
+            return
+        try:
+            self._last_flush = now
+            values = registry.snapshot()
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as file:
+                json.dump([[name, labels, value] for (name, labels), value in values.items()], file)
+            os.replace(temporary, self.path)
+        finally:
+            self._lock.release()
+
+    def collect(self, values):
+        """Suma a los valores de este proceso los de los archivos de los demas"""
+        totals = defaultdict(float, values)
+        for filename in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            path = os.path.join(self.directory, filename)
+            if not filename.endswith(".json") or path == self.path:
+                continue
+            try:
+                with open(path) as file:
+                    rows = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                totals[(name, tuple(tuple(label) for label in labels))] += value
+        return totals
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    directory = getattr(settings, "METRICS_MULTIPROC_DIR", "")
+    if not directory:
+        return None
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            _store = FileStore(directory)
+            atexit.register(_flush_at_exit)
+    return _store
+
+
+def _flush_at_exit():
+    if _store is not None and os.path.isdir(_store.directory):
+        _store.flush(force=True)
+
+
+def collect():
+    """Valores de todas las metricas: los de este proceso y, si hay, los de los demas"""
+    values = registry.snapshot()
+    store = get_store()
+    if store is not None:
+        store.flush(force=True)
+        values = store.collect(values)
+    return values
+
+
+def render_text(values):
+    """Formato de exposicion de texto de Prometheus (version 0.0.4)"""
+    families = defaultdict(list)
+    for (name, labels), value in values.items():
+        family = next((metric for metric in METRICS if name.startswith(metric)), name)
+        families[family].append((name, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        type, help = METRICS.get(family, ("untyped", ""))
+        lines.append(f"# HELP {family} {help}")
+        lines.append(f"# TYPE {family} {type}")
+        for name, labels, value in sorted(families[family], key=_sort_key):
+            label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels)
+            lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _sort_key(row):
+    name, labels, _ = row
+    le = dict(labels).get("le")
+    bound = math.inf if le == "+Inf" else float(le) if le else 0
+    return name, tuple(label for label in labels if label[0] != "le"), bound
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsMiddleware:
+    """Va en MIDDLEWARE justo despues de QueryBudgetMiddleware (que solo cuenta las
+    consultas y agrega headers) para medir el request completo"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        render_time = [0.0]
+        token = _render_time.set(render_time)
+        start = time.perf_counter()
+        try:
+            with record_queries() as queries:
+                response = self.get_response(request)
+        finally:
+            _render_time.reset(token)
+        elapsed = time.perf_counter() - start
+
+        # El nombre de URL y no el path, para que las etiquetas no crezcan con los ids
+        match = request.resolver_match
+        view = (("view", (match.url_name or match.view_name) if match else "<sin ruta>"),)
+        registry.inc(
+            "eventhub_http_requests_total",
+            (("method", request.method), ("status", str(response.status_code))) + view,
+        )
+        registry.observe("eventhub_http_request_duration_seconds", view, elapsed)
+        registry.inc("eventhub_db_queries_total", view, queries.count)
+        registry.inc("eventhub_db_query_duration_seconds_total", view, queries.duration)
+        if render_time[0]:
+            registry.observe("eventhub_template_render_duration_seconds", view, render_time[0])
+
+        store = get_store()
+        if store is not None:
+            store.flush()
+        return response
+
+
+def _can_read_metrics(request):
+    """Usuarios staff, o el header Authorization: Bearer <METRICS_TOKEN>"""
+    if request.user.is_staff:
+        return True
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, value = request.headers.get("Authorization", "").partition(" ")
+    return bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(value.strip().encode(), token.encode())
+
+
+def metrics_view(request):
+    if not getattr(settings, "METRICS_ENABLED", False):
+        raise Http404
+    if not _can_read_metrics(request):
+        raise PermissionDenied
+    return HttpResponse(render_text(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class TimedTemplate:
+    """Template que suma su tiempo de render al request en curso"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        render_time = _render_time.get()
+        if render_time is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            render_time[0] += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend de templates de Django que mide el render para MetricsMiddleware"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 19:18
+
+from django.db import migrations, models
+from django.db.models import F, Q, Sum
+
+
+def backfill_inventory(apps, schema_editor):
+    Event = apps.get_model('app', 'Event')
+    for event in Event.objects.annotate(
+        general=Sum('tickets__quantity', filter=Q(tickets__type='GENERAL')),
+        vip=Sum('tickets__quantity', filter=Q(tickets__type='VIP')),
+    ).iterator():
+        Event.objects.filter(pk=event.pk).update(general_sold=event.general or 0, vip_sold=event.vip or 0)
+    # Los eventos que ya estaban llenos quedan agotados, como si se hubieran vendido con los contadores
+    Event.objects.annotate(sold=F('general_sold') + F('vip_sold')).filter(
+        state='AVAILABLE', sold__gte=F('general_capacity') + F('vip_capacity'),
+    ).update(state='SOLD_OUT')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='general_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='vip_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_ticket_hold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+    ]
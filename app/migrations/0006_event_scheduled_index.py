@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['scheduled_at', 'id'], name='event_scheduled_id_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_event_scheduled_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='venue',
+            name='city',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'scheduled_at'], name='event_category_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['state', 'scheduled_at'], name='event_state_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'venue', 'scheduled_at', 'state'], name='event_facets_idx'),
+        ),
+    ]
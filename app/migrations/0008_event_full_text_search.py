@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 19:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import app.event_search
+
+
+def create_search_index(apps, schema_editor):
+    app.event_search.rebuild(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    app.event_search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_event_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSearchDocument',
+            fields=[
+                ('event', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='app.event')),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('document', app.event_search.SearchDocumentField(db_column='app_event_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'app_event_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
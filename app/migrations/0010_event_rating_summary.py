@@ -0,0 +1,74 @@
+# Generated by Django 5.2 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_summary(apps, schema_editor):
+    Event = apps.get_model('app', 'Event')
+    Rating = apps.get_model('app', 'Rating')
+    summaries = {}
+    for row in Rating.objects.values('event', 'rating').annotate(total=Count('id'), points=Sum('rating')):
+        summary = summaries.setdefault(row['event'], {'rating_count': 0, 'rating_sum': 0})
+        summary['rating_count'] += row['total']
+        summary['rating_sum'] += row['points']
+        if 1 <= row['rating'] <= 5:
+            summary[f"rating_{row['rating']}"] = row['total']
+    for event_id, summary in summaries.items():
+        summary['rating_average'] = summary['rating_sum'] / summary['rating_count']
+        Event.objects.filter(pk=event_id).update(**summary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_comment_rating_event_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_average',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['rating_average', 'rating_count', 'id'], name='event_rating_idx'),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 20:33
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_scheduled_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('scheduled_at', models.DateTimeField()),
+                ('state', models.CharField(choices=[('AVAILABLE', 'Activo'), ('CANCELLED', 'Cancelado'), ('REPROGRAM', 'Reprogramado'), ('SOLD_OUT', 'Agotado'), ('FINISHED', 'Finalizado')], max_length=20)),
+                ('category_name', models.CharField(max_length=100)),
+                ('venue_name', models.CharField(max_length=200)),
+                ('venue_city', models.CharField(max_length=100)),
+                ('general_capacity', models.PositiveIntegerField()),
+                ('vip_capacity', models.PositiveIntegerField()),
+                ('general_sold', models.PositiveIntegerField()),
+                ('vip_sold', models.PositiveIntegerField()),
+                ('rating_count', models.PositiveIntegerField()),
+                ('rating_average', models.FloatField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organizer', 'scheduled_at', 'id'], name='archived_event_org_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+SEQUENCE = "app_ticket_code_seq"
+
+
+def create_sequence(apps, schema_editor):
+    """En Postgres los codigos salen de una secuencia que sigue desde la fila"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    TicketCodeSequence = apps.get_model("app", "TicketCodeSequence")
+    start = TicketCodeSequence.objects.filter(pk=1).values_list("next_value", flat=True).first() or 1
+    schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {int(start)}")
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    TicketCodeSequence = apps.get_model("app", "TicketCodeSequence")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT nextval('{SEQUENCE}')")
+        next_value = cursor.fetchone()[0]
+    TicketCodeSequence.objects.update_or_create(pk=1, defaults={"next_value": next_value})
+    schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_archived_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_ticket_code_postgres_sequence'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_category_sched_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_state_sched_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_facets_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'scheduled_at', 'id', 'venue', 'state'], name='event_category_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['state', 'scheduled_at', 'id', 'venue', 'category'], name='event_state_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'venue', 'state', 'scheduled_at'], name='event_facets_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_event_search_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedevent',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -1,9 +1,38 @@
-import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, models, transaction
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import event_search, reference_cache, ticket_codes
+from .database import retry_on_lock
+
+
+def rating_average(total, count):
+    """Expresion con el promedio total / count, o 0 si no hay calificaciones"""
+    return Coalesce(
+        Cast(total, models.FloatField()) / NullIf(count, 0), Value(0.0), output_field=models.FloatField()
+    )
+
+
+def without_index(field):
+    """La columna para una condicion del WHERE que SQLite no tiene que usar para elegir
+    indice: +columna tiene el mismo valor, pero el planificador no la asocia a los
+    indices que la incluyen. En otras bases es la columna tal cual."""
+    if connection.vendor != "sqlite":
+        return F(field)
+    return models.Func(F(field), template="+%(expressions)s")
 
 
 class User(AbstractUser):
@@ -30,6 +59,16 @@ class User(AbstractUser):
 
         return errors
 
+    def release_event_counters(self):
+        """Descuenta de los contadores de los eventos lo que compro, reservo o califico el
+        usuario, y vuelve a AVAILABLE los que quedan con cupo. Se llama antes de borrarlo
+        (pre_delete): el borrado en cascada se lleva sus tickets, reservas y calificaciones
+        sin pasar por Ticket.delete, TicketHold.release ni Rating.delete. Los eventos que
+        organiza se borran con el."""
+        for model in (Ticket, TicketHold):
+            Event.release_inventory(model.objects.filter(user=self).exclude(event__organizer=self))
+        Event.remove_ratings(Rating.objects.filter(user=self).exclude(event__organizer=self))
+
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
@@ -40,6 +79,15 @@ class Category(models.Model):
     
     def user_is_organizer(self, user):
         return user.is_organizer
+
+    @classmethod
+    def cached(cls):
+        """Todas las categorias por id desde el cache de datos de referencia (ver
+        app/reference_cache.py). Se cargan del primario: una replica atrasada dejaria
+        el cache viejo hasta el proximo cambio."""
+        return reference_cache.get(
+            "categories", lambda: {category.pk: category for category in cls.objects.using(DEFAULT_DB_ALIAS).order_by("pk")}
+        )
     
     @classmethod
     def validate(cls, name, description, is_active):
@@ -80,7 +128,7 @@ class Category(models.Model):
 
 class Venue(models.Model):  
     name  = models.CharField(max_length=200)
-    city = models.CharField(max_length=100)
+    city = models.CharField(max_length=100, db_index=True)
     address = models.CharField(max_length=200)
     capacity = models.IntegerField()
     contact = models.CharField(max_length=100)
@@ -90,6 +138,13 @@ class Venue(models.Model):
 
     def user_is_organizer(self, user):
         return user.is_organizer
+
+    @classmethod
+    def cached(cls):
+        """Todos los recintos por id desde el cache de datos de referencia"""
+        return reference_cache.get(
+            "venues", lambda: {venue.pk: venue for venue in cls.objects.using(DEFAULT_DB_ALIAS).order_by("pk")}
+        )
     
     def clean(self):
         #validaciones: campos vacios
@@ -134,15 +189,272 @@ class Event(models.Model):
     general_capacity = models.PositiveIntegerField(default=100)
     vip_capacity = models.PositiveIntegerField(default=50)
     state = models.CharField(max_length=20, choices=EVENT_STATE, default="AVAILABLE")
+    general_sold = models.PositiveIntegerField(default=0)
+    vip_sold = models.PositiveIntegerField(default=0)
+    # Resumen de calificaciones, mantenido por Rating.save/delete
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Listado de proximos eventos: scheduled_at > now ORDER BY scheduled_at, id
+            models.Index(fields=["scheduled_at", "id"], name="event_scheduled_id_idx"),
+            # Busqueda con filtros por categoria o estado dentro de una ventana de fechas,
+            # en el orden del listado. Las otras columnas de filtro van al final para
+            # descartar filas sin leer la tabla: si casi ningun evento cumple los demas
+            # filtros se recorre todo el rango del indice
+            models.Index(fields=["category", "scheduled_at", "id", "venue", "state"], name="event_category_sched_idx"),
+            models.Index(fields=["state", "scheduled_at", "id", "venue", "category"], name="event_state_sched_idx"),
+            # Cubre la consulta de facetas (GROUP BY categoria, recinto, estado) sin leer la
+            # tabla y en el orden del indice, sin ordenar los grupos aparte
+            models.Index(fields=["category", "venue", "state", "scheduled_at"], name="event_facets_idx"),
+            # Listado ordenado por calificacion: rating_average DESC, rating_count DESC, id DESC
+            models.Index(fields=["rating_average", "rating_count", "id"], name="event_rating_idx"),
+        ]
+
+    # Tipo de entrada -> (contador de vendidas, capacidad)
+    INVENTORY_FIELDS = {
+        "GENERAL": ("general_sold", "general_capacity"),
+        "VIP": ("vip_sold", "vip_capacity"),
+    }
+
+    RATING_VALUES = range(1, 6)
+    RATING_FIELDS = ("rating_count", "rating_sum", "rating_average") + tuple(
+        f"rating_{value}" for value in RATING_VALUES
+    )
+    # Columnas que solo se modifican con UPDATE atomicos
+    COUNTER_FIELDS = ("general_sold", "vip_sold") + RATING_FIELDS
     
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        """Los contadores de vendidas y de calificaciones solo se modifican con UPDATE
+        atomicos, asi que al editar un evento no se pisan con los valores (posiblemente
+        viejos) en memoria.
+
+        Por lo mismo, si el estado es AVAILABLE o SOLD_OUT (el que sigue al cupo) se
+        recalcula en el UPDATE desde los contadores guardados y la capacidad nueva:
+        reserve_tickets pudo haberlo agotado despues de que se cargo el evento."""
+        if not self._state.adding and self.pk and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+            if self.state in ("AVAILABLE", "SOLD_OUT"):
+                sold = sum(F(sold_field) for sold_field, _ in self.INVENTORY_FIELDS.values())
+                capacity = sum(getattr(self, capacity_field) for _, capacity_field in self.INVENTORY_FIELDS.values())
+                self.state = Case(
+                    When(GreaterThanOrEqual(sold, capacity), then=Value("SOLD_OUT")), default=Value("AVAILABLE")
+                )
+                super().save(*args, **kwargs)
+                self.refresh_from_db(fields=["state"])
+                return
+        super().save(*args, **kwargs)
+
+    def reserve_tickets(self, type, quantity):
+        """Suma quantity a las vendidas del tipo solo si queda cupo, en un unico UPDATE
+        condicional que tambien pasa el evento a SOLD_OUT si se llena. Devuelve False
+        si no alcanza el cupo."""
+        if type not in self.INVENTORY_FIELDS:
+            return True
+        sold_field, capacity_field = self.INVENTORY_FIELDS[type]
+        updated = Event.objects.filter(
+            pk=self.pk, **{f"{sold_field}__lte": F(capacity_field) - quantity}
+        ).update(**{
+            sold_field: F(sold_field) + quantity,
+            "state": self.capacity_state({sold_field: quantity}),
+        })
+        return updated == 1
+
+    def release_tickets(self, type, quantity):
+        """Devuelve quantity entradas del tipo al cupo disponible (y el evento a
+        AVAILABLE si estaba agotado)"""
+        if type not in self.INVENTORY_FIELDS:
+            return
+        sold_field, _ = self.INVENTORY_FIELDS[type]
+        Event.objects.filter(pk=self.pk).update(**{
+            sold_field: F(sold_field) - quantity,
+            "state": self.capacity_state({sold_field: -quantity}),
+        })
+
+    @classmethod
+    def release_inventory(cls, rows):
+        """Devuelve al cupo las entradas de un queryset de Ticket o TicketHold que se va
+        a borrar por lote, con un UPDATE por evento y tipo"""
+        totals = rows.order_by().values_list("event_id", "type").annotate(total=models.Sum("quantity"))
+        for event_id, type, total in totals:
+            cls(pk=event_id).release_tickets(type, total)
+
+    @classmethod
+    def capacity_state(cls, changes=None):
+        """Expresion para un UPDATE con el estado que corresponde al cupo despues de
+        sumar changes ({contador: cantidad}) a las vendidas. Solo alterna entre
+        AVAILABLE y SOLD_OUT; los eventos cancelados, reprogramados o finalizados
+        quedan como estan."""
+        changes = changes or {}
+        sold = sum(F(sold_field) + changes.get(sold_field, 0) for sold_field, _ in cls.INVENTORY_FIELDS.values())
+        capacity = sum(F(capacity_field) for _, capacity_field in cls.INVENTORY_FIELDS.values())
+        return Case(
+            When(GreaterThanOrEqual(sold, capacity), state="AVAILABLE", then=Value("SOLD_OUT")),
+            When(LessThan(sold, capacity), state="SOLD_OUT", then=Value("AVAILABLE")),
+            default=F("state"),
+        )
+
+    @classmethod
+    def sync_capacity_state(cls, queryset=None):
+        """Recalcula SOLD_OUT/AVAILABLE desde los contadores guardados, por ejemplo
+        despues de reconciliarlos o de cambiar la capacidad de un evento"""
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.filter(state__in=("AVAILABLE", "SOLD_OUT")).update(state=cls.capacity_state())
+
+    @classmethod
+    def reconcile_inventory(cls, queryset=None):
+        """Recalcula los contadores de vendidas desde los tickets y las reservas (holds)
+        con un unico UPDATE. Devuelve la cantidad de eventos cuyos contadores estaban
+        desfasados."""
+        queryset = cls.objects.all() if queryset is None else queryset
+
+        def total_of(model, type):
+            return Coalesce(
+                Subquery(
+                    model.objects.filter(event=OuterRef("pk"), type=type)
+                    .values("event")
+                    .annotate(total=models.Sum("quantity"))
+                    .values("total")
+                ),
+                0,
+            )
+
+        totals = {
+            sold_field: total_of(Ticket, type) + total_of(TicketHold, type)
+            for type, (sold_field, _) in cls.INVENTORY_FIELDS.items()
+        }
+        with transaction.atomic():
+            drifted = queryset.annotate(
+                **{f"real_{field}": total for field, total in totals.items()}
+            ).exclude(
+                general_sold=F("real_general_sold"), vip_sold=F("real_vip_sold")
+            ).count()
+            queryset.update(**totals)
+            cls.sync_capacity_state(queryset)
+        return drifted
+
+    @classmethod
+    def adjust_rating_summary(cls, event_id, added=None, removed=None):
+        """Suma la calificacion added y resta removed (valores de 1 a 5, o None) al
+        resumen del evento con un unico UPDATE"""
+        count = (added is not None) - (removed is not None)
+        total = (added or 0) - (removed or 0)
+        changes = {
+            "rating_count": F("rating_count") + count,
+            "rating_sum": F("rating_sum") + total,
+            "rating_average": rating_average(F("rating_sum") + total, F("rating_count") + count),
+        }
+        for value, delta in ((added, 1), (removed, -1)):
+            if value in cls.RATING_VALUES:
+                field = f"rating_{value}"
+                changes[field] = changes.get(field, F(field)) + delta
+        cls.objects.filter(pk=event_id).update(**changes)
+
+    @classmethod
+    def remove_ratings(cls, ratings):
+        """Resta del resumen de cada evento las calificaciones de un queryset de Rating
+        que se va a borrar por lote, con un UPDATE por evento"""
+        removed = defaultdict(Counter)
+        for event_id, value, count in (
+            ratings.order_by().values_list("event_id", "rating").annotate(count=models.Count("*"))
+        ):
+            removed[event_id][value] += count
+        for event_id, values in removed.items():
+            count = sum(values.values())
+            total = sum(value * times for value, times in values.items())
+            changes = {
+                "rating_count": F("rating_count") - count,
+                "rating_sum": F("rating_sum") - total,
+                "rating_average": rating_average(F("rating_sum") - total, F("rating_count") - count),
+            }
+            for value, times in values.items():
+                if value in cls.RATING_VALUES:
+                    changes[f"rating_{value}"] = F(f"rating_{value}") - times
+            cls.objects.filter(pk=event_id).update(**changes)
+
+    @classmethod
+    def reconcile_ratings(cls, queryset=None):
+        """Recalcula el resumen de calificaciones desde la tabla de ratings con un unico
+        UPDATE. Devuelve la cantidad de eventos cuyo resumen estaba desfasado."""
+        queryset = cls.objects.all() if queryset is None else queryset
+
+        def aggregate(function, **filters):
+            return Coalesce(
+                Subquery(
+                    Rating.objects.filter(event=OuterRef("pk"), **filters)
+                    .values("event")
+                    .annotate(total=function)
+                    .values("total")
+                ),
+                0,
+            )
+
+        totals = {
+            "rating_count": aggregate(models.Count("*")),
+            "rating_sum": aggregate(models.Sum("rating")),
+        }
+        for value in cls.RATING_VALUES:
+            totals[f"rating_{value}"] = aggregate(models.Count("*"), rating=value)
+        totals["rating_average"] = rating_average(totals["rating_sum"], totals["rating_count"])
+
+        with transaction.atomic():
+            drifted = queryset.annotate(
+                **{f"real_{field}": total for field, total in totals.items()}
+            ).exclude(
+                **{field: F(f"real_{field}") for field in totals}
+            ).count()
+            queryset.update(**totals)
+        return drifted
+
+    @property
+    def rating_histogram(self):
+        """[(valor, cantidad, porcentaje)] de 5 a 1, para mostrar la distribucion"""
+        return [
+            (
+                value,
+                getattr(self, f"rating_{value}"),
+                round(100 * getattr(self, f"rating_{value}") / self.rating_count) if self.rating_count else 0,
+            )
+            for value in reversed(self.RATING_VALUES)
+        ]
+
+    # Estados que pasan a FINISHED cuando llega la fecha del evento
+    FINISHABLE_STATES = ("AVAILABLE", "SOLD_OUT", "REPROGRAM")
+
+    @classmethod
+    def finish_elapsed(cls, now=None):
+        """Marca FINISHED los eventos cuya fecha ya paso con un unico UPDATE, que
+        recorre el indice (state, scheduled_at). Devuelve la cantidad de eventos
+        finalizados."""
+        now = now or timezone.now()
+        return cls.objects.filter(
+            state__in=cls.FINISHABLE_STATES, scheduled_at__lte=now
+        ).update(state="FINISHED", updated_at=now)
+
+    def available_tickets(self, type):
+        """Entradas disponibles del tipo segun los contadores guardados en la base"""
+        sold_field, capacity_field = self.INVENTORY_FIELDS[type]
+        sold, capacity = Event.objects.filter(pk=self.pk).values_list(sold_field, capacity_field).get()
+        return max(capacity - sold, 0)
     
     
     def tickets_sold(self):
-        return self.ticket_set.aggregate(total=models.Sum('quantity'))['total'] or 0
+        return self.general_sold + self.vip_sold
 
     def is_full(self):
         return self.tickets_sold() >= self.total_capacity
@@ -153,10 +465,9 @@ class Event(models.Model):
     
     
     def can_be_bought(self):
-        if ((self.state == "CANCELLED") or (self.state == "SOLD_OUT") or (self.state == "FINISHED")):
-            return False 
-        else:
-            return True
+        """Solo mira el estado guardado: SOLD_OUT se mantiene al comprar y cancelar,
+        asi que no hace falta contar tickets"""
+        return self.state not in ("CANCELLED", "SOLD_OUT", "FINISHED")
         
     def no_changes_after_cancelled(self):
         return self.state == "CANCELLED"
@@ -206,6 +517,122 @@ class Event(models.Model):
         self.state = state or self.state
         self.save()
 
+    @classmethod
+    def search(cls, category=None, city=None, date_from=None, date_to=None, state=None, text=None):
+        """Busca proximos eventos con filtros opcionales. date_to es exclusiva. Con text
+        se buscan las palabras en titulo y descripcion (ver event_search) y los eventos
+        quedan anotados con search_rank.
+
+        Devuelve (queryset de eventos, facetas). Las facetas son
+        {"categories": [(id, nombre, cantidad)], "cities": [(ciudad, cantidad)]} y salen
+        de una sola consulta agrupada por categoria y recinto (ver _facet_groups). Cada
+        faceta ignora su propio filtro, asi se ve cuantos eventos hay en las otras
+        opciones."""
+        now = timezone.now()
+
+        def upcoming(queryset, field):
+            queryset = queryset.filter(**{f"{field}__gt": now})
+            if date_from is not None:
+                queryset = queryset.filter(**{f"{field}__gte": date_from})
+            if date_to is not None:
+                queryset = queryset.filter(**{f"{field}__lt": date_to})
+            return event_search.search(queryset, text) if text else queryset
+
+        base = upcoming(cls.objects.all(), "scheduled_at")
+        # Sin estadisticas (ANALYZE) SQLite usaria event_scheduled_id_idx para la ventana de
+        # fechas de las facetas, leyendo cada fila de la tabla y ordenando los grupos
+        # aparte; comparando sin indice recorre event_facets_idx, que cubre la consulta
+        facet_base = upcoming(cls.objects.alias(facet_scheduled_at=without_index("scheduled_at")), "facet_scheduled_at")
+
+        category_counts = Counter()
+        city_counts = Counter()
+        # Cantidad de eventos de cada filtro por separado, para elegir el indice
+        filters = {"state": state, "category_id": category, "venue__city": city}
+        filters = {name: value for name, value in filters.items() if value is not None}
+        filter_counts = Counter()
+        upcoming_count = 0
+        for group_category, category_name, group_city, group_state, total in cls._facet_groups(facet_base, date_from, date_to, text):
+            upcoming_count += total
+            group = {"state": group_state, "category_id": group_category, "venue__city": group_city}
+            for name, value in filters.items():
+                if group[name] == value:
+                    filter_counts[name] += total
+            if state is not None and group_state != state:
+                continue
+            if city is None or group_city == city:
+                category_counts[(group_category, category_name)] += total
+            if category is None or group_category == category:
+                city_counts[group_city] += total
+
+        facets = {
+            "categories": sorted(
+                ((pk, name, total) for (pk, name), total in category_counts.items()),
+                key=lambda facet: facet[1],
+            ),
+            "cities": sorted(city_counts.items()),
+        }
+
+        # Sin estadisticas (ANALYZE) SQLite no sabe que filtro descarta mas filas: puede
+        # recorrer event_state_sched_idx buscando una categoria con pocos eventos, o
+        # buscar los recintos de la ciudad y ordenar aparte todos sus eventos. Las
+        # facetas ya dan cuantos eventos cumple cada filtro, asi que el de menos eventos
+        # elige el indice y los demas se comparan sin indice. La ciudad solo lo elige si
+        # tiene menos del 1% de los eventos; si no conviene recorrer un indice por fecha
+        # y descartar los de otras ciudades (a lo sumo unas 100 filas por evento listado)
+        indexed = sorted(filters, key=lambda name: filter_counts[name])
+        if indexed and indexed[0] == "venue__city" and filter_counts["venue__city"] * 100 >= upcoming_count:
+            indexed.pop(0)
+        events = base
+        for name, value in filters.items():
+            if indexed and name == indexed[0]:
+                events = events.filter(**{name: value})
+            else:
+                alias = "unindexed_" + name.replace("__", "_")
+                events = events.alias(**{alias: without_index(name)}).filter(**{alias: value})
+        return events, facets
+
+    @classmethod
+    def _facet_groups(cls, base, date_from, date_to, text):
+        """Cantidad de eventos por (categoria, nombre, ciudad, estado, total).
+
+        El GROUP BY es por ids y estado, en el orden de event_facets_idx, para que lo
+        resuelva ese indice sin leer la tabla ni ordenar los grupos. El estado va en el
+        GROUP BY y no en el WHERE: con un filtro de estado SQLite elegiria
+        event_state_sched_idx, leeria cada fila de la tabla y ordenaria los grupos aparte
+        (varias veces mas lento). Por lo mismo base compara la fecha sin indice (ver
+        search). Los nombres de las categorias y ciudades salen del
+        cache de datos de referencia. Como no depende de los filtros de categoria, ciudad
+        y estado, se guarda en el cache EVENT_FACETS_CACHE_SECONDS y lo comparten todas
+        las combinaciones de esos filtros. Las busquedas por texto no se guardan: casi
+        nunca se repiten."""
+        key = "event_facets:{}:{}".format(
+            date_from.isoformat() if date_from else "",
+            date_to.isoformat() if date_to else "",
+        )
+        timeout = 0 if text else getattr(settings, "EVENT_FACETS_CACHE_SECONDS", 0)
+        if timeout:
+            groups = cache.get(key)
+            if groups is not None:
+                return groups
+
+        rows = list(
+            base.order_by().values_list("category_id", "venue_id", "state").annotate(total=models.Count("*"))
+        )
+        categories, venues = Category.cached(), Venue.cached()
+        if any(category not in categories or venue not in venues for category, venue, _, _ in rows):
+            # Filas cargadas sin señales (bulk_create): se recarga una vez
+            reference_cache.invalidate("categories")
+            reference_cache.invalidate("venues")
+            categories, venues = Category.cached(), Venue.cached()
+        groups = [
+            (category, categories[category].name, venues[venue].city, state, total)
+            for category, venue, state, total in rows
+        ]
+
+        if timeout:
+            cache.set(key, groups, timeout)
+        return groups
+
     def get_cuenta_regresiva(self):
         now = timezone.now()
         diff = self.scheduled_at - now
@@ -217,6 +644,23 @@ class Event(models.Model):
 
         return f"{days} dias, {hours} horas, {minutes} minutos"
         
+class EventSearchDocument(models.Model):
+    """Fila del indice FTS5 de eventos (solo SQLite). La tabla y sus triggers los
+    crea event_search.install, Django no la administra."""
+    event = models.OneToOneField(
+        Event, primary_key=True, db_column="rowid", db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name="search_document",
+    )
+    title = models.TextField()
+    description = models.TextField()
+    document = event_search.SearchDocumentField(db_column=event_search.FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = event_search.FTS_TABLE
+
+
 class Comment(models.Model):
     title = models.CharField(max_length=100, default="Sin título")
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="comments")
@@ -225,12 +669,26 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Paginas de comentarios de un evento, del mas nuevo al mas viejo
+            models.Index(fields=["event", "created_at", "id"], name="comment_event_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.title[:30]}"
 
     def can_user_delete(self, user):
         return self.user == user or self.event.organizer == user
 
+class RatingQuerySet(models.QuerySet):
+    def delete(self):
+        """Los borrados por lote (sin pasar por Rating.delete) tambien actualizan el resumen"""
+        with transaction.atomic(using=self.db):
+            Event.remove_ratings(self)
+            return super().delete()
+
+
 class Rating(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="ratings")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ratings")
@@ -241,12 +699,134 @@ class Rating(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = RatingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Paginas de calificaciones de un evento, de la mas nueva a la mas vieja
+            models.Index(fields=["event", "created_at", "id"], name="rating_event_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.rating}"
+
+    def save(self, *args, **kwargs):
+        """Mantiene el resumen de calificaciones del evento en la misma transaccion"""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk:
+                previous = Rating.objects.filter(pk=self.pk).values_list("event_id", "rating").first()
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                Event.adjust_rating_summary(self.event_id, added=self.rating)
+            elif previous[0] == self.event_id:
+                Event.adjust_rating_summary(self.event_id, added=self.rating, removed=previous[1])
+            else:
+                Event.adjust_rating_summary(previous[0], removed=previous[1])
+                Event.adjust_rating_summary(self.event_id, added=self.rating)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Event.adjust_rating_summary(self.event_id, removed=self.rating)
+        return result
     
     def can_user_delete_or_edit(self, user):
         return self.user == user or self.event.organizer == user
 
+class TicketCodeSequence(models.Model):
+    """Secuencia de la que salen los codigos de ticket.
+
+    En Postgres los numeros salen de una secuencia de la base (POSTGRES_SEQUENCE):
+    nextval no toma locks ni se deshace con la transaccion, asi que las compras de
+    distintos eventos no se esperan entre si en una fila. Un rollback deja un hueco.
+
+    En SQLite, donde igual escribe una transaccion a la vez, se reservan bloques con
+    un UPDATE sobre esta fila dentro de la transaccion del que inserta los tickets: si
+    se revierte, el bloque vuelve a quedar libre."""
+
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    POSTGRES_SEQUENCE = "app_ticket_code_seq"
+
+    @classmethod
+    def allocate(cls, count):
+        """Reserva count numeros nuevos y los devuelve"""
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT nextval('{cls.POSTGRES_SEQUENCE}') FROM generate_series(1, %s)", [count]
+                )
+                return [value for value, in cursor.fetchall()]
+
+        sequence = cls.objects.filter(pk=1)
+        with transaction.atomic():
+            if not sequence.update(next_value=F("next_value") + count):
+                cls.objects.get_or_create(pk=1)
+                sequence.update(next_value=F("next_value") + count)
+            end = sequence.values_list("next_value", flat=True).get()
+        return range(end - count, end)
+
+
+class ScheduledJob(models.Model):
+    """Estado y metricas de una tarea periodica (ver app/scheduler.py).
+
+    next_run_at hace de lease: un worker toma la tarea con un UPDATE condicional que
+    la corre hacia adelante, asi que con varios workers solo uno la ejecuta. Si ese
+    worker muere, la tarea se libera sola cuando vence el lease."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    owner = models.CharField(max_length=200, blank=True)
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    last_result = models.BigIntegerField(null=True, blank=True)
+    total_result = models.BigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def claim(cls, name, owner, lease_seconds):
+        """Toma la tarea si le toca correr. Devuelve True si este worker la tiene que ejecutar"""
+        now = timezone.now()
+        cls.objects.get_or_create(name=name, defaults={"next_run_at": now})
+        claimed = cls.objects.filter(name=name, next_run_at__lte=now).update(
+            next_run_at=now + timedelta(seconds=lease_seconds),
+            owner=owner,
+            last_started_at=now,
+        )
+        return claimed == 1
+
+    @classmethod
+    def finish(cls, name, owner, interval_seconds, duration_ms, result=None, error=""):
+        """Registra el resultado de la corrida y cuando le toca la proxima"""
+        changes = {
+            "next_run_at": timezone.now() + timedelta(seconds=interval_seconds),
+            "runs": F("runs") + 1,
+            "last_duration_ms": duration_ms,
+            "last_error": error,
+        }
+        if error:
+            changes["failures"] = F("failures") + 1
+        else:
+            changes["last_result"] = result
+            changes["total_result"] = F("total_result") + (result or 0)
+        cls.objects.filter(name=name, owner=owner).update(**changes)
+
+
+class TicketQuerySet(models.QuerySet):
+    def delete(self):
+        """Los borrados por lote (sin pasar por Ticket.delete) tambien devuelven el cupo"""
+        with transaction.atomic(using=self.db):
+            Event.release_inventory(self)
+            return super().delete()
+
+
 class Ticket(models.Model):
     TICKET_TYPES = (
     ("GENERAL", "General"),
@@ -261,14 +841,54 @@ class Ticket(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tickets")
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="tickets")
 
+    objects = TicketQuerySet.as_manager()
+
+    MAX_PER_USER = 4
+
+    @retry_on_lock
     def save(self, *args,**kwargs):
-        """Se asegura de que se haya generado el code antes de guardar"""
-        if not self.ticket_code:
-            self.ticket_code = self.generate_ticket_code()
-        super().save(*args,**kwargs)
+        """Se asegura de que se haya generado el code antes de guardar y reserva el cupo
+        en el evento dentro de la misma transaccion"""
+        code, adding = self.ticket_code, self._state.adding
+        try:
+            with transaction.atomic():
+                if not self.ticket_code:
+                    self.ticket_code = self.generate_ticket_code()
+                if self.pk:
+                    previous = Ticket.objects.filter(pk=self.pk).values_list("type", "quantity").first()
+                    if previous is not None:
+                        self.event.release_tickets(*previous)
+                if not self.event.reserve_tickets(self.type, self.quantity):
+                    available = self.event.available_tickets(self.type)
+                    if available == 0:
+                        raise ValidationError({"quantity": "No hay mas cupo disponible."})
+                    raise ValidationError({
+                        "quantity": f"No hay suficiente cupo disponible para este tipo de entrada. Solo quedan {available} entradas."
+                    })
+                super().save(*args,**kwargs)
+        except Exception:
+            # La transaccion se deshizo junto con el numero de la secuencia (en SQLite):
+            # si se reintenta, el codigo (y el id) tienen que ser nuevos
+            self.ticket_code = code
+            if adding:
+                self.pk, self._state.adding = None, True
+            raise
+
+    @retry_on_lock
+    def delete(self, *args, **kwargs):
+        """Libera el cupo reservado en el evento junto con el borrado"""
+        with transaction.atomic():
+            self.event.release_tickets(self.type, self.quantity)
+            return super().delete(*args, **kwargs)
 
     def generate_ticket_code(self):
-        return uuid.uuid4().hex[:12].upper()
+        return self.allocate_codes(1)[0]
+
+    @classmethod
+    def allocate_codes(cls, count):
+        """Devuelve count codigos de ticket nuevos, unicos y sin reintentos. Sirve para
+        armar los tickets de un bulk_create."""
+        return ticket_codes.encode_many(TicketCodeSequence.allocate(count))
     
     def can_be_modified_by_user(self, user):
         """Permite editar si es el dueño del ticket"""
@@ -281,9 +901,449 @@ class Ticket(models.Model):
     @classmethod
     def can_purchase(cls, user, event):
         tickets_bought = cls.objects.filter(user=user, event=event).aggregate(total=models.Sum('quantity'))['total'] or 0
-        return tickets_bought < 4
+        return tickets_bought < cls.MAX_PER_USER
+
+    @classmethod
+    def validate_purchase(cls, user, event, type, quantity, ticket=None):
+        errors = {}
+
+        if quantity is None or quantity <= 0:
+            errors["quantity"] = "La cantidad debe ser mayor a cero."
+
+        if type not in Event.INVENTORY_FIELDS:
+            errors["type"] = "Tipo de entrada no válido."
+
+        if len(errors.keys()) > 0:
+            return errors
+
+        tickets_bought = cls.objects.filter(user=user, event=event)
+        if ticket is not None:
+            tickets_bought = tickets_bought.exclude(pk=ticket.pk)
+        total_bought = tickets_bought.aggregate(total=models.Sum('quantity'))['total'] or 0
+        # Las reservas vigentes del usuario tambien cuentan para el maximo
+        total_bought += TicketHold.objects.filter(
+            user=user, event=event, expires_at__gt=timezone.now()
+        ).aggregate(total=models.Sum('quantity'))['total'] or 0
+
+        if total_bought + quantity > cls.MAX_PER_USER:
+            errors["quantity"] = f"No podés comprar más de {cls.MAX_PER_USER} entradas para este evento. Ya tenés {total_bought}."
+
+        return errors
+
+    @classmethod
+    def purchase(cls, user, event, type, quantity, ticket=None):
+        """Compra (o modifica, si se pasa ticket) entradas reservando el cupo de forma
+        atomica: el UPDATE condicional sobre el evento y el insert del ticket van en la
+        misma transaccion, asi que dos compras simultaneas no pueden sobrevender.
+
+        Devuelve (ticket, None) si la compra se realizo o (None, errores)."""
+        errors = cls.validate_purchase(user, event, type, quantity, ticket)
+
+        if len(errors.keys()) > 0:
+            return None, errors
+
+        if ticket is None:
+            ticket = cls(user=user, event=event)
+        previous = (ticket.type, ticket.quantity)
+        ticket.type = type
+        ticket.quantity = quantity
+
+        try:
+            ticket.save()
+        except ValidationError as e:
+            ticket.type, ticket.quantity = previous
+            return None, {field: messages[0] for field, messages in e.message_dict.items()}
+
+        return ticket, None
     
+    @classmethod
+    def issue_bulk(cls, event, rows, batch_size=1000):
+        """Emite tickets en cantidad para un evento (sponsors, grupos, empresas).
+
+        rows son filas (username, tipo, cantidad) sin validar. Valida todas las filas,
+        reserva el cupo una sola vez por tipo y los inserta con bulk_create por lotes
+        dentro de una transaccion. Si las filas de un tipo no entran todas se emiten, en
+        orden, las que entran en el cupo que queda; solo las demas vuelven con error. No
+        aplica el maximo por usuario de la compra web.
+
+        Devuelve una lista con el resultado de cada fila: un dict con username, type,
+        quantity, ticket_code (si se emitio) y error (si no)."""
+        results = []
+        for row in rows:
+            username, type, quantity = (list(row) + [None, None, None])[:3]
+            result = {
+                "username": (username or "").strip(),
+                "type": (type or "").strip().upper(),
+                "quantity": quantity,
+                "ticket_code": None,
+                "error": None,
+            }
+            try:
+                result["quantity"] = int(quantity)
+                if result["quantity"] <= 0:
+                    result["error"] = "La cantidad debe ser mayor a cero."
+            except (TypeError, ValueError):
+                result["error"] = "La cantidad ingresada no es válida."
+            if result["type"] not in Event.INVENTORY_FIELDS:
+                result["error"] = "Tipo de entrada no válido."
+            results.append(result)
+
+        users = User.objects.in_bulk(
+            {result["username"] for result in results}, field_name="username"
+        )
+        for result in results:
+            if result["error"] is None and result["username"] not in users:
+                result["error"] = "No existe un usuario con ese nombre."
+            if result["error"] is None and not event.can_be_bought():
+                result["error"] = f"El evento está {event.get_state_display()}."
+
+        with transaction.atomic():
+            for type in Event.INVENTORY_FIELDS:
+                rows_of_type = [r for r in results if r["error"] is None and r["type"] == type]
+                # Si otra compra toma cupo entre la lectura y el UPDATE se vuelve a repartir
+                while rows_of_type and not event.reserve_tickets(type, sum(r["quantity"] for r in rows_of_type)):
+                    available = event.available_tickets(type)
+                    fitting = []
+                    for result in rows_of_type:
+                        if result["quantity"] <= available:
+                            fitting.append(result)
+                            available -= result["quantity"]
+                        else:
+                            result["error"] = (
+                                f"No hay cupo {type} para {result['quantity']} entradas. Solo quedan {available}."
+                            )
+                    rows_of_type = fitting
+
+            to_issue = [result for result in results if result["error"] is None]
+            if to_issue:
+                tickets = []
+                for result, code in zip(to_issue, cls.allocate_codes(len(to_issue))):
+                    result["ticket_code"] = code
+                    tickets.append(cls(
+                        ticket_code=code,
+                        quantity=result["quantity"],
+                        type=result["type"],
+                        user=users[result["username"]],
+                        event=event,
+                    ))
+                cls.objects.bulk_create(tickets, batch_size=batch_size)
+
+        return results
+
     def __str__(self):
         """Cuando se imprima un objeto en especifico se vera de la siguiente forma: VIP x2 - juanito - A1B2C3D4E5F6"""
         return f"{self.type} x{self.quantity} - {self.user.username} - {self.ticket_code}"
-    
\ No newline at end of file
+
+
+class TicketHold(models.Model):
+    """Reserva temporal de entradas: descuenta el cupo del evento al crearse y se
+    convierte en Ticket al confirmarla. Las vencidas las libera release_expired."""
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="holds")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ticket_holds")
+    type = models.CharField(max_length=10, choices=Ticket.TICKET_TYPES)
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.type} x{self.quantity} - {self.user.username} - vence {self.expires_at:%H:%M}"
+
+    @classmethod
+    def hold_duration(cls):
+        return timedelta(minutes=getattr(settings, "TICKET_HOLD_MINUTES", 10))
+
+    @classmethod
+    @retry_on_lock
+    def reserve(cls, user, event, type, quantity):
+        """Reserva quantity entradas del tipo por TICKET_HOLD_MINUTES minutos.
+
+        Devuelve (hold, None) si se pudo reservar o (None, errores)."""
+        if not event.can_be_bought():
+            return None, {"event": f"No se puede realizar la compra porque el evento está {event.get_state_display()}."}
+        errors = Ticket.validate_purchase(user, event, type, quantity)
+        if len(errors.keys()) > 0:
+            return None, errors
+
+        with transaction.atomic():
+            if not event.reserve_tickets(type, quantity):
+                available = event.available_tickets(type)
+                if available == 0:
+                    return None, {"quantity": "No hay mas cupo disponible."}
+                return None, {
+                    "quantity": f"No hay suficiente cupo disponible para este tipo de entrada. Solo quedan {available} entradas."
+                }
+            hold = cls.objects.create(
+                event=event,
+                user=user,
+                type=type,
+                quantity=quantity,
+                expires_at=timezone.now() + cls.hold_duration(),
+            )
+        return hold, None
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def confirm(self):
+        """Convierte la reserva en un Ticket. El cupo pasa de la reserva al ticket dentro
+        de la misma transaccion, sin quedar libre para otro comprador.
+
+        Devuelve (ticket, None) o (None, errores) si la reserva ya vencio o el evento ya
+        no se puede comprar (cancelado o finalizado); en ese caso la reserva se libera."""
+        with transaction.atomic():
+            # El DELETE condicional evita confirmar una reserva que el barrido ya libero
+            deleted, _ = TicketHold.objects.filter(pk=self.pk, expires_at__gt=timezone.now()).delete()
+            if not deleted:
+                return None, {"hold": "La reserva venció. Volvé a intentar la compra."}
+            self.event.release_tickets(self.type, self.quantity)
+            # Con el cupo de la reserva devuelto el evento ya no figura SOLD_OUT, asi que
+            # solo lo rechaza si se cancelo o finalizo mientras tanto
+            self.event.refresh_from_db(fields=["state"])
+            if not self.event.can_be_bought():
+                return None, {
+                    "event": f"No se puede realizar la compra porque el evento está {self.event.get_state_display()}."
+                }
+            ticket, errors = Ticket.purchase(self.user, self.event, self.type, self.quantity)
+            if errors:
+                transaction.set_rollback(True)
+        return ticket, errors
+
+    def release(self):
+        """Cancela la reserva y devuelve el cupo al evento"""
+        with transaction.atomic():
+            deleted, _ = TicketHold.objects.filter(pk=self.pk).delete()
+            if deleted:
+                self.event.release_tickets(self.type, self.quantity)
+
+    @classmethod
+    def release_expired(cls, now=None, batch_size=1000):
+        """Libera en lotes las reservas vencidas usando el indice sobre expires_at.
+        Cada lote es una transaccion con un DELETE y un UPDATE por evento y tipo.
+        Devuelve la cantidad de reservas liberadas."""
+        now = now or timezone.now()
+        released = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    cls.objects.select_for_update(skip_locked=True)
+                    .filter(expires_at__lte=now)
+                    .order_by("expires_at")
+                    .values_list("pk", "event_id", "type", "quantity")[:batch_size]
+                )
+                if not batch:
+                    break
+
+                cls.objects.filter(pk__in=[pk for pk, _, _, _ in batch]).delete()
+
+                to_release = Counter()
+                for _, event_id, type, quantity in batch:
+                    to_release[(event_id, type)] += quantity
+                for (event_id, type), quantity in to_release.items():
+                    Event(pk=event_id).release_tickets(type, quantity)
+
+            released += len(batch)
+            if len(batch) < batch_size:
+                break
+        return released
+
+
+class IdempotencyKey(models.Model):
+    """Resultado guardado de un POST con clave de idempotencia, para devolver la misma
+    respuesta si el usuario reenvia el formulario o el cliente reintenta."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    location = models.CharField(max_length=500, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key_per_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.key}"
+
+    @property
+    def is_completed(self):
+        return self.status_code is not None
+
+    @classmethod
+    def claim(cls, user, key):
+        """Toma la clave para procesar el request. Devuelve (registro, True) si este
+        request la tomo, o (registro existente, False) si ya estaba tomada. Las claves
+        vencidas (o de un request que se corto a la mitad) se pueden volver a tomar."""
+        now = timezone.now()
+        lease = now + timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_LEASE_SECONDS", 60))
+        try:
+            with transaction.atomic():
+                return cls.objects.create(user=user, key=key, expires_at=lease), True
+        except IntegrityError:
+            pass
+
+        existing = cls.objects.filter(user=user, key=key)
+        if existing.filter(expires_at__lte=now).update(
+            status_code=None, location="", content_type="", body="", expires_at=lease
+        ):
+            return existing.get(), True
+        return existing.first(), False
+
+    def complete(self, response):
+        """Guarda la respuesta para repetirla ante duplicados"""
+        self.status_code = response.status_code
+        self.location = response.get("Location", "")
+        self.content_type = "" if self.location else response.get("Content-Type", "")
+        self.body = "" if self.location else response.content.decode(response.charset)
+        self.expires_at = timezone.now() + timedelta(hours=getattr(settings, "IDEMPOTENCY_KEY_TTL_HOURS", 24))
+        self.save()
+
+    @classmethod
+    def purge_expired(cls, batch_size=5000):
+        """Borra en lotes las claves vencidas usando el indice sobre expires_at"""
+        now = timezone.now()
+        purged = 0
+        while True:
+            ids = list(cls.objects.filter(expires_at__lte=now).values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return purged
+            purged += cls.objects.filter(pk__in=ids).delete()[0]
+
+
+class ArchivedEvent(models.Model):
+    """Evento finalizado que se saco de las tablas vivas junto con sus tickets,
+    comentarios y calificaciones (ver archive_finished).
+
+    Guarda como columnas lo que se lista y filtra, y el resto en un documento JSON,
+    asi que un evento archivado ocupa una sola fila. Conserva el id del evento."""
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    scheduled_at = models.DateTimeField()
+    state = models.CharField(max_length=20, choices=Event.EVENT_STATE)
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_events")
+    category_name = models.CharField(max_length=100)
+    venue_name = models.CharField(max_length=200)
+    venue_city = models.CharField(max_length=100)
+    general_capacity = models.PositiveIntegerField()
+    vip_capacity = models.PositiveIntegerField()
+    general_sold = models.PositiveIntegerField()
+    vip_sold = models.PositiveIntegerField()
+    rating_count = models.PositiveIntegerField()
+    rating_average = models.FloatField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # {"tickets": [...], "comments": [...], "ratings": [...]}
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organizer", "scheduled_at", "id"], name="archived_event_org_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def tickets_sold(self):
+        return self.general_sold + self.vip_sold
+
+    def _rows(self, key):
+        rows = self.data.get(key, [])
+        for row in rows:
+            for name in ("buy_date", "created_at", "updated_at"):
+                if isinstance(row.get(name), str):
+                    row[name] = parse_datetime(row[name])
+        return rows
+
+    @cached_property
+    def tickets(self):
+        return self._rows("tickets")
+
+    @cached_property
+    def comments(self):
+        return self._rows("comments")
+
+    @cached_property
+    def ratings(self):
+        return self._rows("ratings")
+
+    @classmethod
+    def archive_finished(cls, before=None, batch_size=100):
+        """Archiva en lotes los eventos FINISHED anteriores a before (por defecto hace
+        ARCHIVE_FINISHED_AFTER_DAYS dias), recorriendo el indice (state, scheduled_at).
+
+        Cada lote es una transaccion que inserta los archivados y borra el evento con
+        todas sus filas, asi que si se corta a la mitad se puede volver a correr y sigue
+        desde donde quedo. Devuelve la cantidad de eventos archivados."""
+        if before is None:
+            days = getattr(settings, "ARCHIVE_FINISHED_AFTER_DAYS", 365)
+            before = timezone.now() - timedelta(days=days)
+
+        archived = 0
+        while True:
+            with transaction.atomic():
+                events = list(
+                    Event.objects.select_for_update(skip_locked=True, of=("self",))
+                    .select_related("category", "venue")
+                    .filter(state="FINISHED", scheduled_at__lt=before)
+                    .order_by("scheduled_at", "id")[:batch_size]
+                )
+                if not events:
+                    break
+                cls.archive(events)
+
+            archived += len(events)
+            if len(events) < batch_size:
+                break
+        return archived
+
+    @classmethod
+    def archive(cls, events):
+        """Copia los eventos con sus filas relacionadas y los borra de las tablas vivas.
+        Tiene que correr dentro de una transaccion."""
+        ids = [event.pk for event in events]
+        documents = {pk: {"tickets": [], "comments": [], "ratings": []} for pk in ids}
+        related = (
+            ("tickets", Ticket, ("ticket_code", "type", "quantity", "buy_date")),
+            ("comments", Comment, ("title", "text", "created_at", "updated_at")),
+            ("ratings", Rating, ("title", "text", "rating", "created_at")),
+        )
+        for key, model, fields in related:
+            rows = (
+                model.objects.filter(event_id__in=ids)
+                .order_by("pk")
+                .values("event_id", "user_id", *fields, username=F("user__username"))
+            )
+            for row in rows:
+                documents[row.pop("event_id")][key].append(row)
+
+        cls.objects.bulk_create([
+            cls(
+                id=event.pk,
+                title=event.title,
+                description=event.description,
+                scheduled_at=event.scheduled_at,
+                state=event.state,
+                organizer_id=event.organizer_id,
+                category_name=event.category.name,
+                venue_name=event.venue.name,
+                venue_city=event.venue.city,
+                general_capacity=event.general_capacity,
+                vip_capacity=event.vip_capacity,
+                general_sold=event.general_sold,
+                vip_sold=event.vip_sold,
+                rating_count=event.rating_count,
+                rating_average=event.rating_average,
+                created_at=event.created_at,
+                data=documents[event.pk],
+            )
+            for event in events
+        ])
+        # Ningun modelo relacionado tiene a su vez relaciones ni senales, asi que Django
+        # borra cada tabla con un DELETE ... WHERE event_id IN (...)
+        Event.objects.filter(pk__in=ids).delete()
@@ -0,0 +1,81 @@
+"""Paginacion por cursor (keyset) para listados grandes.
+
+En vez de OFFSET, cada pagina se pide a partir de los valores de orden de la ultima
+fila de la pagina anterior, asi que con un indice sobre esos campos cualquier pagina
+cuesta lo mismo que la primera.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _ordering(queryset):
+    fields = []
+    for name in queryset.query.order_by:
+        descending = name.startswith("-")
+        fields.append((name.lstrip("-"), descending))
+    if not fields or len({descending for _, descending in fields}) != 1:
+        raise ValueError("keyset_page necesita un order_by con todos los campos en el mismo sentido")
+    return fields
+
+
+def _field(queryset, name):
+    """Campo del modelo o de una anotacion (por ejemplo un ranking de busqueda)"""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(queryset, cursor):
+    """Convierte el cursor en los valores de los campos de orden, o None si es invalido"""
+    fields = _ordering(queryset)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(fields):
+            return None
+        model_fields = [_field(queryset, name) for name, _ in fields]
+        return [field.to_python(value) for field, value in zip(model_fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=20):
+    """Devuelve (filas de la pagina, cursor de la pagina siguiente o None).
+
+    El queryset tiene que estar ordenado por campos que identifiquen una fila (por
+    ejemplo ("scheduled_at", "id")), todos ascendentes o todos descendentes."""
+    fields = _ordering(queryset)
+    values = decode_cursor(queryset, cursor) if cursor else None
+
+    if values is not None:
+        lookup = "lt" if fields[0][1] else "gt"
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        after = Q()
+        for i, (name, _) in enumerate(fields):
+            condition = Q(**{f"{name}__{lookup}": values[i]})
+            for j in range(i):
+                condition &= Q(**{fields[j][0]: values[j]})
+            after |= condition
+        # La cota simple sobre el primer campo deja que la base recorra el indice por rango.
+        # Va primera en el WHERE: si el queryset ya tiene otra cota sobre ese campo (el
+        # listado pide scheduled_at > ahora) SQLite usa la primera que encuentra, y desde
+        # ahora recorreria todas las paginas anteriores
+        queryset = queryset.filter(after).filter(**{f"{fields[0][0]}__{lookup}e": values[0]})
+        where = queryset.query.where
+        where.children.insert(0, where.children.pop())
+
+    rows = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, name) for name, _ in fields])
+    return rows, next_cursor
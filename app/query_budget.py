@@ -0,0 +1,96 @@
+"""Presupuesto de consultas SQL por vista, para detectar N+1 antes de que lleguen a
+produccion.
+
+QueryBudgetMiddleware cuenta las consultas y el tiempo de base de cada request con un
+execute_wrapper (no necesita DEBUG), los devuelve en los headers X-Query-Count y
+X-Query-Time-Ms y registra un warning cuando la vista pasa el presupuesto que tiene en
+QUERY_BUDGETS segun su nombre de URL. Con QUERY_BUDGET_ENABLED=False el middleware se
+saca de la cadena al arrancar y no cuesta nada.
+
+Los tests usan los mismos presupuestos con QueryBudgetAssertions.assertQueryBudget.
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Cantidad y tiempo total de las consultas ejecutadas. Se usa como execute_wrapper"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def record_queries():
+    """Cuenta las consultas que se ejecutan dentro del bloque, en todas las bases"""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+def budget_for(url_name):
+    """Maximo de consultas para la vista, o None si no tiene limite"""
+    return getattr(settings, "QUERY_BUDGETS", {}).get(url_name, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+
+
+class QueryBudgetMiddleware:
+    """Tiene que ir primero en MIDDLEWARE para contar tambien la sesion y el usuario"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as stats:
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = str(stats.count)
+        response["X-Query-Time-Ms"] = f"{stats.duration_ms:.1f}"
+
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        budget = budget_for(url_name)
+        if budget is not None and stats.count > budget:
+            response["X-Query-Budget-Exceeded"] = str(budget)
+            logger.warning(
+                "%s hizo %d consultas (%.1fms), el presupuesto es %d: %s %s",
+                url_name, stats.count, stats.duration_ms, budget, request.method, request.get_full_path(),
+            )
+        return response
+
+
+class QueryBudgetAssertions:
+    """Mixin de TestCase para verificar que una vista respeta su presupuesto"""
+
+    @contextmanager
+    def assertQueryBudget(self, url_name, using="default"):
+        from django.test.utils import CaptureQueriesContext
+
+        budget = budget_for(url_name)
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if budget is not None and len(context) > budget:
+            queries = "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, 1))
+            self.fail(f"{url_name} hizo {len(context)} consultas, el presupuesto es {budget}:\n{queries}")
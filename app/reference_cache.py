@@ -0,0 +1,92 @@
+"""Cache en dos niveles de los datos de referencia (categorias y recintos).
+
+Son tablas chicas que casi no cambian y se leen en casi todas las paginas (el
+formulario de eventos, el listado con sus facetas). Cada conjunto tiene un sello de
+version en el cache de Django, compartido por todos los workers:
+
+- nivel 1: un LRU en la memoria del proceso con (version, datos). Si la version
+  coincide con la del cache compartido se devuelve sin mas.
+- nivel 2: el cache de Django con los datos bajo una clave que incluye la version,
+  asi un worker que arranca (o que quedo viejo) los trae sin ir a la base.
+
+Al guardar o borrar una categoria o un recinto (post_save / post_delete) se cambia
+la version: los demas workers lo ven en su proxima lectura y recargan. Se cambia de
+nuevo al confirmar la transaccion, para que nadie deje en el cache lo que leyo antes
+del commit. Las cargas masivas que no disparan señales (bulk_create) llaman a
+invalidate.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version_key(name):
+    return f"reference:{name}:version"
+
+
+def _data_key(name, version):
+    return f"reference:{name}:{version}"
+
+
+def _new_version(name):
+    version = uuid.uuid4().hex
+    cache.set(_version_key(name), version, None)
+    return version
+
+
+def get(name, loader):
+    """Datos del conjunto name; loader los arma desde la base si no estan en ningun
+    nivel. Lo que se devuelve se comparte entre requests: es de solo lectura."""
+    version = cache.get(_version_key(name))
+    if version is None:
+        # Nadie lo cargo todavia, o el cache compartido lo descarto
+        version = _new_version(name)
+
+    with _lock:
+        entry = _local.get(name)
+        if entry is not None and entry[0] == version:
+            _local.move_to_end(name)
+            return entry[1]
+
+    data = cache.get(_data_key(name, version))
+    if data is None:
+        data = loader()
+        cache.set(_data_key(name, version), data, settings.REFERENCE_CACHE_SECONDS)
+
+    with _lock:
+        _local[name] = (version, data)
+        _local.move_to_end(name)
+        while len(_local) > settings.REFERENCE_CACHE_LOCAL_SIZE:
+            _local.popitem(last=False)
+    return data
+
+
+def invalidate(name):
+    _new_version(name)
+    with _lock:
+        _local.pop(name, None)
+
+
+def clear_local():
+    """Vacia el nivel del proceso (como si fuera un worker nuevo)"""
+    with _lock:
+        _local.clear()
+
+
+def invalidate_on_change(model, name):
+    """Cambia la version de name cada vez que se guarda o borra un model"""
+
+    def changed(sender, **kwargs):
+        invalidate(name)
+        transaction.on_commit(lambda: invalidate(name))
+
+    for action, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(changed, sender=model, weak=False, dispatch_uid=f"reference-cache-{name}-{action}")
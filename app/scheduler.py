@@ -0,0 +1,95 @@
+"""Tareas periodicas de la app (finalizar eventos, liberar reservas vencidas, archivar
+eventos viejos, borrar claves de idempotencia vencidas).
+
+Cada tarea tiene una fila en ScheduledJob que hace de lease y guarda sus metricas,
+asi que es seguro correr el scheduler en varios workers a la vez: en cada intervalo
+solo uno ejecuta cada tarea. Se puede correr como comando (run_scheduler --loop) o
+dentro de cada proceso web con SCHEDULER_IN_PROCESS.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import ArchivedEvent, Event, IdempotencyKey, ScheduledJob, TicketHold
+
+logger = logging.getLogger(__name__)
+
+# nombre -> (funcion que devuelve la cantidad de filas procesadas, intervalo en segundos)
+JOBS = {
+    "finish_elapsed_events": (Event.finish_elapsed, 60),
+    "release_expired_holds": (TicketHold.release_expired, 30),
+    "archive_finished_events": (ArchivedEvent.archive_finished, 3600),
+    "purge_idempotency_keys": (IdempotencyKey.purge_expired, 3600),
+}
+
+# Cuanto puede tardar una corrida antes de que otro worker pueda retomar la tarea
+LEASE_SECONDS = 300
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_job(name, owner=None):
+    """Ejecuta la tarea si le toca y ningun otro worker la tiene. Devuelve el
+    resultado de la corrida o None si no se ejecuto."""
+    job, interval = JOBS[name]
+    owner = owner or worker_name()
+    if not ScheduledJob.claim(name, owner, LEASE_SECONDS):
+        return None
+
+    start = time.perf_counter()
+    try:
+        result = job()
+    except Exception as e:
+        logger.exception("Fallo la tarea %s", name)
+        ScheduledJob.finish(name, owner, interval, _elapsed_ms(start), error=repr(e))
+        return None
+
+    ScheduledJob.finish(name, owner, interval, _elapsed_ms(start), result=result)
+    return result
+
+
+def run_pending(owner=None):
+    """Corre las tareas a las que les toca. Devuelve {nombre: resultado} de las ejecutadas"""
+    results = {}
+    for name in JOBS:
+        result = run_job(name, owner)
+        if result is not None:
+            results[name] = result
+    return results
+
+
+def _elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _loop(interval):
+    while True:
+        close_old_connections()
+        try:
+            run_pending()
+        except Exception:
+            logger.exception("Fallo el scheduler")
+        close_old_connections()
+        time.sleep(interval)
+
+
+def start_in_process(**kwargs):
+    """Arranca (una sola vez por proceso) un thread que corre las tareas pendientes.
+    Se conecta a request_started para que solo arranque en los procesos web."""
+    global _thread
+    with _thread_lock:
+        if _thread is not None:
+            return
+        interval = getattr(settings, "SCHEDULER_POLL_SECONDS", 15)
+        _thread = threading.Thread(target=_loop, args=(interval,), name="eventhub-scheduler", daemon=True)
+        _thread.start()
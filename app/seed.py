@@ -0,0 +1,250 @@
+"""Datos sinteticos reproducibles a escala (ver el comando seed).
+
+Con la misma semilla y las mismas cantidades genera siempre los mismos datos, todo
+dentro de una transaccion y con un unico hash de contraseña para todos los usuarios.
+Usuarios, categorias, recintos y eventos se insertan con bulk_create por lotes (hacen
+falta sus ids). Tickets, comentarios y calificaciones, que son millones de filas, van
+con executemany directo: bulk_create prepara cada campo de cada objeto por separado y
+con 1M de tickets eso tardaba mas que la propia base. Al final los contadores de los
+eventos (vendidas, resumen de calificaciones, agotado) se recalculan con las
+reconciliaciones de Event, asi que quedan consistentes con los tickets y ratings.
+
+Los usuarios compradores son seed0, seed1, ... con la contraseña PASSWORD.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app import reference_cache
+from app.models import Category, Comment, Event, Rating, Ticket, TicketHold, User, Venue
+
+PREFIX = "seed"
+PASSWORD = "seed"
+
+DEFAULTS = {
+    "users": 20_000,
+    "organizers": 200,
+    "categories": 40,
+    "venues": 500,
+    "events": 20_000,
+    "tickets": 1_000_000,
+    "comments": 100_000,
+    "ratings": 100_000,
+}
+
+GENRES = ("Rock", "Jazz", "Tango", "Folklore", "Teatro", "Stand up", "Opera", "Electronica", "Cumbia", "Danza")
+FORMATS = ("Festival", "Concierto", "Noche", "Ciclo", "Encuentro", "Gira")
+CITIES = ("Buenos Aires", "La Plata", "Cordoba", "Rosario", "Mendoza", "Mar del Plata", "Salta", "Neuquen")
+
+
+def clear():
+    """Borra los datos generados. Devuelve la cantidad de eventos borrados"""
+    users = User.objects.filter(username__startswith=PREFIX)
+    # Primero los eventos, asi sus tickets se borran sin devolver cupo a eventos que
+    # igual se van; despues lo que compraron en otros eventos
+    deleted, _ = Event.objects.filter(organizer__in=users).delete()
+    for model in (Ticket, Comment, Rating, TicketHold):
+        model.objects.filter(user__in=users).delete()
+    users.delete()
+    Category.objects.filter(name__startswith=PREFIX).delete()
+    Venue.objects.filter(name__startswith=PREFIX).delete()
+    return deleted
+
+
+def _pairs(rng, count, users, events):
+    """(indice de usuario, indice de evento) sin repetir pares: cada usuario recorre los
+    eventos desde uno al azar, asi no pasa del maximo de entradas por evento ni
+    califica dos veces el mismo evento"""
+    if count > users * events:
+        raise ValueError(f"No entran {count} filas sin repetir usuario y evento")
+    starts = [rng.randrange(events) for _ in range(users)]
+    for i in range(count):
+        user, turn = i % users, i // users
+        yield user, (starts[user] + turn) % events
+
+
+def _in_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(model, fields, rows):
+    """INSERT por lotes sin pasar por los objetos del modelo. Los valores tienen que
+    venir listos para la base (ids de las FK, fechas ya adaptadas)"""
+    meta = model._meta
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(meta.get_field(name).column) for name in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {quote(meta.db_table)} ({columns}) VALUES ({placeholders})", rows)
+
+
+@contextmanager
+def _bulk_load():
+    """En SQLite, mientras dura la carga, no se espera al disco en cada escritura y se
+    agranda la cache de paginas. Si se corta a la mitad se vuelve a generar, asi que
+    no hace falta la durabilidad. Se restaura la configuracion anterior al terminar.
+    Dentro de una transaccion ya abierta (por ejemplo en los tests) SQLite no deja
+    cambiar synchronous, asi que se carga con la configuracion que haya."""
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+    pragmas = {"synchronous": "OFF", "cache_size": "-262144", "temp_store": "MEMORY"}
+    with connection.cursor() as cursor:
+        previous = {}
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}")
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in previous.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def _thousands(number):
+    return f"{number:_.0f}".replace("_", ".")
+
+
+class _Phases:
+    """Mide cada etapa y la informa con filas por segundo"""
+
+    def __init__(self, log):
+        self.log = log
+        self.start = time.perf_counter()
+
+    def done(self, rows, name):
+        elapsed = time.perf_counter() - self.start
+        rate = f", {_thousands(rows / elapsed)} filas/s" if rows and elapsed else ""
+        self.log(f"{_thousands(rows)} {name} en {elapsed:.1f}s{rate}")
+        self.start = time.perf_counter()
+
+
+def generate(seed=1, batch_size=10_000, log=None, **counts):
+    """Genera los datos con las cantidades de DEFAULTS (se pueden pisar por nombre).
+    Devuelve las cantidades creadas."""
+    counts = {**DEFAULTS, **counts}
+    rng = random.Random(seed)
+    phases = _Phases(log or (lambda message: None))
+    now = timezone.now()
+    db_now = connection.ops.adapt_datetimefield_value(now)
+    # Hashear una contraseña cuesta decenas de milisegundos: se hace una sola vez
+    password = make_password(PASSWORD, salt=f"{PREFIX}{seed}")
+
+    with _bulk_load(), transaction.atomic():
+        users = User.objects.bulk_create(
+            [User(username=f"{PREFIX}{i}", password=password) for i in range(counts["users"])],
+            batch_size=batch_size,
+        )
+        organizers = User.objects.bulk_create(
+            [
+                User(username=f"{PREFIX}_org{i}", password=password, is_organizer=True)
+                for i in range(counts["organizers"])
+            ],
+            batch_size=batch_size,
+        )
+        categories = Category.objects.bulk_create(
+            [Category(name=f"{PREFIX} {GENRES[i % len(GENRES)]} {i}") for i in range(counts["categories"])],
+            batch_size=batch_size,
+        )
+        venues = Venue.objects.bulk_create(
+            [
+                Venue(
+                    name=f"{PREFIX} Recinto {i}",
+                    city=CITIES[i % len(CITIES)],
+                    address=f"Calle {i}",
+                    capacity=rng.choice((500, 2_000, 10_000)),
+                    contact=f"recinto{i}@example.com",
+                )
+                for i in range(counts["venues"])
+            ],
+            batch_size=batch_size,
+        )
+        phases.done(len(users) + len(organizers) + len(categories) + len(venues), "usuarios, categorias y recintos")
+
+        # Uno de cada cinco eventos ya paso
+        events = []
+        for i in range(counts["events"]):
+            past = i % 5 == 0
+            general = rng.choice((100, 500, 1_000, 5_000))
+            events.append(Event(
+                title=f"{rng.choice(FORMATS)} de {rng.choice(GENRES)} {i}",
+                description=f"{rng.choice(GENRES)} en vivo. Evento generado numero {i}.",
+                scheduled_at=now - timedelta(days=rng.uniform(1, 720)) if past else now + timedelta(days=rng.uniform(0.1, 180)),
+                state="FINISHED" if past else "AVAILABLE",
+                organizer=rng.choice(organizers),
+                category=rng.choice(categories),
+                venue=rng.choice(venues),
+                general_capacity=general,
+                vip_capacity=general // 10,
+            ))
+        events = Event.objects.bulk_create(events, batch_size=batch_size)
+        phases.done(len(events), "eventos")
+
+        user_ids = [user.id for user in users]
+        event_ids = [event.id for event in events]
+
+        tickets = 0
+        for batch in _in_batches(_pairs(rng, counts["tickets"], len(users), len(events)), batch_size):
+            codes = Ticket.allocate_codes(len(batch))
+            _insert(
+                Ticket,
+                ("ticket_code", "quantity", "type", "user", "event", "buy_date"),
+                [
+                    (code, rng.randint(1, 4), "VIP" if rng.random() < 0.1 else "GENERAL", user_ids[user], event_ids[event], db_now)
+                    for (user, event), code in zip(batch, codes)
+                ],
+            )
+            tickets += len(batch)
+        phases.done(tickets, "tickets")
+
+        for batch in _in_batches(range(counts["comments"]), batch_size):
+            _insert(
+                Comment,
+                ("title", "text", "user", "event", "created_at", "updated_at"),
+                [
+                    (f"Comentario {i}", "Muy buena organizacion, volveria.", rng.choice(user_ids), rng.choice(event_ids), db_now, db_now)
+                    for i in batch
+                ],
+            )
+        phases.done(counts["comments"], "comentarios")
+
+        for batch in _in_batches(_pairs(rng, counts["ratings"], len(users), len(events)), batch_size):
+            _insert(
+                Rating,
+                ("title", "text", "rating", "user", "event", "created_at"),
+                [
+                    ("Resena", "Lindo evento.", rng.choices((1, 2, 3, 4, 5), weights=(1, 1, 2, 3, 3))[0], user_ids[user], event_ids[event], db_now)
+                    for user, event in batch
+                ],
+            )
+        phases.done(counts["ratings"], "calificaciones")
+
+        # Los contadores salen de las filas insertadas; los eventos que se pasaron de
+        # cupo quedan con la capacidad justa (y agotados)
+        Event.reconcile_inventory()
+        Event.objects.filter(general_sold__gt=F("general_capacity")).update(general_capacity=F("general_sold"))
+        Event.objects.filter(vip_sold__gt=F("vip_capacity")).update(vip_capacity=F("vip_sold"))
+        Event.sync_capacity_state()
+        Event.reconcile_ratings()
+        phases.done(len(events), "eventos con contadores recalculados")
+
+    # bulk_create no manda post_save: las categorias y recintos nuevos no llegan solos
+    # al cache de datos de referencia
+    reference_cache.invalidate("categories")
+    reference_cache.invalidate("venues")
+    return counts
@@ -0,0 +1,14 @@
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+from app.idempotency import FORM_FIELD
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_key():
+    """Campo oculto con una clave nueva por cada vez que se muestra el formulario"""
+    return format_html('<input type="hidden" name="{}" value="{}">', FORM_FIELD, uuid.uuid4().hex)
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from app.models import Category, Event, User, Venue
+
+
+def create_sale_event(organizer, **kwargs):
+    """Crea el evento muy pedido de las pruebas de salida a la venta"""
+    return Event.objects.create(
+        title="Evento muy pedido",
+        description="Salida a la venta",
+        scheduled_at=timezone.now() + timedelta(days=10),
+        organizer=organizer,
+        category=Category.objects.create(name="Recitales"),
+        venue=Venue.objects.create(name="Estadio", city="La Plata", address="Calle 1", capacity=1000, contact="x"),
+        **kwargs,
+    )
+
+
+class BaseTicketSaleTest(TransactionTestCase):
+    """Clase base para las compras en paralelo: un evento muy pedido con el cupo de
+    GENERAL_CAPACITY y VIP_CAPACITY, y BUYERS compradores (buyer0, buyer1, ...)"""
+
+    BUYERS = 0
+    GENERAL_CAPACITY = 100
+    VIP_CAPACITY = 0
+
+    def setUp(self):
+        self.organizer = User.objects.create(username="organizer", is_organizer=True)
+        User.objects.bulk_create([User(username=f"buyer{i}") for i in range(self.BUYERS)])
+        self.buyers = list(User.objects.filter(username__startswith="buyer"))
+        self.event = create_sale_event(
+            self.organizer, general_capacity=self.GENERAL_CAPACITY, vip_capacity=self.VIP_CAPACITY
+        )
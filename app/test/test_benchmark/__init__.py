@@ -0,0 +1,14 @@
+import os
+import statistics
+import unittest
+
+# Los benchmarks arman cientos de miles de filas: solo corren con RUN_BENCHMARKS=True
+benchmark = unittest.skipUnless(
+    os.getenv("RUN_BENCHMARKS") == "True", "Benchmark: correr con RUN_BENCHMARKS=True"
+)
+
+
+def percentiles(timings):
+    """(p50, p95) en milisegundos de una lista de duraciones en segundos"""
+    timings = sorted(timings)
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95) - 1] * 1000
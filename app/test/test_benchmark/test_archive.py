@@ -0,0 +1,146 @@
+import time
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import ArchivedEvent, Category, Comment, Event, Rating, Ticket, User, Venue
+from app.test.test_benchmark import benchmark, percentiles
+
+
+@benchmark
+class ArchiveBenchmark(TestCase):
+    """Consultas sobre las tablas vivas antes y despues de archivar cerca de 1.000.000
+    de filas: 9.000 eventos finalizados con 900.000 tickets, 45.000 comentarios y
+    45.000 calificaciones. Quedan 1.000 eventos futuros con sus filas.
+
+    python manage.py test app.test.test_benchmark.test_archive
+    """
+
+    OLD_EVENTS = 9_000
+    UPCOMING_EVENTS = 1_000
+    TICKETS_PER_EVENT = 100
+    COMMENTS_PER_EVENT = 5
+    RATINGS_PER_EVENT = 5
+    USERS = 1_000
+    SAMPLES = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="bench", password="bench")
+        users = User.objects.bulk_create([User(username=f"user{i}") for i in range(cls.USERS)])
+        cls.buyer = users[0]
+        organizer = User.objects.create(username="organizer", is_organizer=True)
+        category = Category.objects.create(name="Musica")
+        venue = Venue.objects.create(name="Estadio", city="La Plata", address="Calle", capacity=500, contact="x")
+
+        now = timezone.now()
+        events = Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Evento {i}",
+                    description="Descripcion",
+                    scheduled_at=now + timedelta(hours=i - cls.OLD_EVENTS * 2),
+                    organizer=organizer,
+                    category=category,
+                    venue=venue,
+                    state="FINISHED",
+                    general_capacity=cls.TICKETS_PER_EVENT,
+                    general_sold=cls.TICKETS_PER_EVENT,
+                )
+                for i in range(cls.OLD_EVENTS)
+            ]
+            + [
+                Event(
+                    title=f"Evento futuro {i}",
+                    description="Descripcion",
+                    scheduled_at=now + timedelta(hours=i + 1),
+                    organizer=organizer,
+                    category=category,
+                    venue=venue,
+                    general_capacity=cls.TICKETS_PER_EVENT,
+                    general_sold=cls.TICKETS_PER_EVENT,
+                )
+                for i in range(cls.UPCOMING_EVENTS)
+            ],
+            batch_size=5000,
+        )
+
+        codes = iter(Ticket.allocate_codes(len(events) * cls.TICKETS_PER_EVENT))
+        for start in range(0, len(events), 1000):
+            chunk = events[start:start + 1000]
+            Ticket.objects.bulk_create(
+                [
+                    Ticket(
+                        ticket_code=next(codes),
+                        quantity=1,
+                        type="GENERAL",
+                        user=users[(event.pk + i) % cls.USERS],
+                        event=event,
+                    )
+                    for event in chunk
+                    for i in range(cls.TICKETS_PER_EVENT)
+                ],
+                batch_size=5000,
+            )
+        Comment.objects.bulk_create(
+            [
+                Comment(title="Comentario", text="Texto", user=users[(event.pk + i) % cls.USERS], event=event)
+                for event in events
+                for i in range(cls.COMMENTS_PER_EVENT)
+            ],
+            batch_size=5000,
+        )
+        Rating.objects.bulk_create(
+            [
+                Rating(title="Resena", text="Texto", rating=4, user=users[(event.pk + i) % cls.USERS], event=event)
+                for event in events
+                for i in range(cls.RATINGS_PER_EVENT)
+            ],
+            batch_size=5000,
+        )
+
+    def _measure(self, query):
+        timings = []
+        for _ in range(self.SAMPLES):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+        return percentiles(timings)
+
+    def _queries(self):
+        return {
+            "tickets de un usuario": lambda: list(Ticket.objects.filter(user=self.buyer).select_related("event")),
+            "total vendido": lambda: Ticket.objects.aggregate(total=Sum("quantity")),
+            "comentarios de un usuario": lambda: Comment.objects.filter(user=self.buyer).count(),
+            "listado de eventos": lambda: self.client.get(reverse("events"), {"state": "AVAILABLE"}),
+        }
+
+    def test_live_queries_before_and_after_archiving(self):
+        self.client.login(username="bench", password="bench")
+        rows = Ticket.objects.count() + Comment.objects.count() + Rating.objects.count()
+
+        before = {label: self._measure(query) for label, query in self._queries().items()}
+
+        start = time.perf_counter()
+        archived = ArchivedEvent.archive_finished(before=timezone.now())
+        elapsed = time.perf_counter() - start
+
+        after = {label: self._measure(query) for label, query in self._queries().items()}
+
+        self.assertEqual(archived, self.OLD_EVENTS)
+        remaining = Ticket.objects.count() + Comment.objects.count() + Rating.objects.count()
+        moved = rows - remaining
+        print(f"\n{archived} eventos y {moved} filas archivados en {elapsed:.1f}s ({moved / elapsed:,.0f} filas/s)")
+        for label in before:
+            print(
+                f"{label}: p50 {before[label][0]:.1f}ms -> {after[label][0]:.1f}ms, "
+                f"p95 {before[label][1]:.1f}ms -> {after[label][1]:.1f}ms"
+            )
+        # Ninguna consulta viva empeora (con un margen de 20% y 1ms para el ruido), y el
+        # total, que recorre todos los tickets, baja con la tabla
+        for label in before:
+            self.assertLess(after[label][0], before[label][0] * 1.2 + 1)
+        self.assertLess(after["total vendido"][0], before["total vendido"][0] / 2)
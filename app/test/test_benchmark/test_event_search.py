@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Category, Event, User, Venue
+from app.test.test_benchmark import benchmark, percentiles
+
+
+@benchmark
+class EventSearchBenchmark(TestCase):
+    """Busqueda con filtros y facetas sobre 100.000 eventos futuros. Objetivo: p95 < 50ms.
+
+    python manage.py test app.test.test_benchmark.test_event_search
+    """
+
+    EVENTS = 100_000
+    SAMPLES = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="bench", password="bench")
+        organizer = User.objects.create(username="organizer", is_organizer=True)
+        cls.categories = Category.objects.bulk_create([Category(name=f"Categoria {i}") for i in range(20)])
+        venues = Venue.objects.bulk_create([
+            Venue(name=f"Recinto {i}", city=f"Ciudad {i % 10}", address="Calle", capacity=500, contact="x")
+            for i in range(50)
+        ])
+        now = timezone.now()
+        Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Evento {i}",
+                    description="Descripcion",
+                    scheduled_at=now + timedelta(minutes=i + 1),
+                    organizer=organizer,
+                    category=cls.categories[i % len(cls.categories)],
+                    venue=venues[i % len(venues)],
+                    state="AVAILABLE" if i % 4 else "SOLD_OUT",
+                )
+                for i in range(cls.EVENTS)
+            ],
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _measure(self, params):
+        """Cada muestra usa otros valores de filtro (params recibe el numero de muestra),
+        asi no se mide siempre la misma consulta ni el mismo resultado del cache"""
+        timings = []
+        for sample in range(self.SAMPLES):
+            start = time.perf_counter()
+            response = self.client.get(reverse("events"), params(sample))
+            timings.append(time.perf_counter() - start)
+            self.assertEqual(response.status_code, 200)
+        return percentiles(timings)
+
+    def _cases(self):
+        today = timezone.now().date()
+        return (
+            ("sin filtros", lambda sample: {}),
+            ("categoria", lambda sample: {"category": self.categories[sample % 20].id}),
+            ("ciudad + estado", lambda sample: {
+                "city": f"Ciudad {sample % 10}", "state": ("AVAILABLE", "SOLD_OUT")[sample % 2],
+            }),
+            ("texto", lambda sample: {"q": f"evento {4000 + sample}"}),
+            ("todos los filtros", lambda sample: {
+                "category": self.categories[sample % 20].id, "city": f"Ciudad {sample % 10}",
+                "to": (today + timedelta(days=10 + sample)).isoformat(),
+                "state": ("AVAILABLE", "SOLD_OUT")[sample % 2],
+            }),
+        )
+
+    def test_filtered_search_p95(self):
+        self.client.login(username="bench", password="bench")
+
+        print()
+        for label, params in self._cases():
+            p50, p95 = self._measure(params)
+            print(f"{label}: p50 {p50:.1f}ms, p95 {p95:.1f}ms")
+            self.assertLess(p95, 50)
+
+    @override_settings(EVENT_FACETS_CACHE_SECONDS=0)
+    def test_filtered_search_without_facet_cache(self):
+        self.client.login(username="bench", password="bench")
+
+        print()
+        for label, params in self._cases():
+            p50, p95 = self._measure(params)
+            print(f"{label} (sin cache de facetas): p50 {p50:.1f}ms, p95 {p95:.1f}ms")
+            self.assertLess(p95, 50)
@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Category, Event, User, Venue
+from app.pagination import encode_cursor
+from app.test.test_benchmark import benchmark, percentiles
+
+
+@benchmark
+class EventsListingBenchmark(TestCase):
+    """Listado de eventos con 100.000 eventos futuros.
+
+    python manage.py test app.test.test_benchmark.test_events_listing
+    """
+
+    EVENTS = 100_000
+    SAMPLES = 30
+    # Una pagina profunda puede costar a lo sumo esto por la primera
+    MAX_DEEP_PAGE_RATIO = 1.5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="bench", password="bench")
+        organizer = User.objects.create(username="organizer", is_organizer=True)
+        categories = Category.objects.bulk_create([Category(name=f"Categoria {i}") for i in range(20)])
+        venues = Venue.objects.bulk_create([
+            Venue(name=f"Recinto {i}", city=f"Ciudad {i % 10}", address="Calle", capacity=500, contact="x")
+            for i in range(50)
+        ])
+        now = timezone.now()
+        Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Evento {i}",
+                    description="Descripcion",
+                    scheduled_at=now + timedelta(minutes=i + 1),
+                    organizer=organizer,
+                    category=categories[i % len(categories)],
+                    venue=venues[i % len(venues)],
+                )
+                for i in range(cls.EVENTS)
+            ],
+            batch_size=5000,
+        )
+
+    def _measure(self, params):
+        timings = []
+        for _ in range(self.SAMPLES):
+            start = time.perf_counter()
+            response = self.client.get(reverse("events"), params)
+            timings.append(time.perf_counter() - start)
+        return response, percentiles(timings)
+
+    def test_first_and_deep_pages_cost_the_same(self):
+        self.client.login(username="bench", password="bench")
+
+        deep = Event.objects.order_by("scheduled_at", "id")[self.EVENTS // 2]
+        deep_cursor = encode_cursor([deep.scheduled_at, deep.id])
+
+        print()
+        pages = {}
+        for label, params in (("primera pagina", {}), ("pagina 50.000", {"after": deep_cursor})):
+            response, (p50, p95) = self._measure(params)
+            # Despues de medir, con los caches de referencia y de facetas ya cargados
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("events"), params)
+            query_count = len(queries)
+            self.assertEqual(len(response.context["events"]), 25)
+            pages[label] = (query_count, p50)
+            print(f"{label}: {query_count} queries, p50 {p50:.1f}ms, p95 {p95:.1f}ms")
+
+        # Las mismas consultas y (por la mediana, menos sensible al ruido) el mismo costo
+        (first_queries, first_p50), (deep_queries, deep_p50) = pages.values()
+        self.assertEqual(deep_queries, first_queries)
+        self.assertLess(deep_p50, first_p50 * self.MAX_DEEP_PAGE_RATIO)
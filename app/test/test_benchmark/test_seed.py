@@ -0,0 +1,51 @@
+import time
+
+from django.test import TestCase
+
+from app import seed
+from app.models import Event, Ticket, User
+from app.test.test_benchmark import benchmark
+
+
+@benchmark
+class SeedBenchmark(TestCase):
+    """Carga de 1.000.000 de tickets con seed.generate, y la misma carga de tickets
+    armando objetos Ticket para bulk_create, para comparar.
+
+    python manage.py test app.test.test_benchmark.test_seed
+    """
+
+    TICKETS = 1_000_000
+    # Objetivo: 1.000.000 de tickets en menos de un minuto
+    MAX_SECONDS = 60
+
+    def test_seed_throughput(self):
+        print()
+        start = time.perf_counter()
+        seed.generate(tickets=self.TICKETS, comments=100_000, ratings=100_000, log=print)
+        elapsed = time.perf_counter() - start
+        print(f"seed.generate: {elapsed:.1f}s")
+        self.assertEqual(Ticket.objects.count(), self.TICKETS)
+        self.assertLess(elapsed, self.MAX_SECONDS)
+
+    def test_bulk_create_throughput(self):
+        seed.generate(tickets=0, comments=0, ratings=0)
+        user_ids = list(User.objects.values_list("id", flat=True))
+        event_ids = list(Event.objects.values_list("id", flat=True))
+
+        print()
+        start = time.perf_counter()
+        for offset in range(0, self.TICKETS, 10_000):
+            codes = Ticket.allocate_codes(10_000)
+            Ticket.objects.bulk_create([
+                Ticket(
+                    ticket_code=code,
+                    quantity=1,
+                    type="GENERAL",
+                    user_id=user_ids[(offset + i) % len(user_ids)],
+                    event_id=event_ids[(offset + i) // len(user_ids) % len(event_ids)],
+                )
+                for i, code in enumerate(codes)
+            ])
+        elapsed = time.perf_counter() - start
+        print(f"bulk_create: {self.TICKETS:,} tickets en {elapsed:.1f}s, {self.TICKETS / elapsed:,.0f}/s")
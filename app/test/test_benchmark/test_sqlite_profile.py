@@ -0,0 +1,122 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from app.test.test_benchmark import benchmark
+
+
+@benchmark
+class SqliteProfileBenchmark(SimpleTestCase):
+    """Lectores (listado de eventos) y escritores (compras: UPDATE condicional del
+    cupo mas INSERT del ticket) en paralelo sobre un archivo SQLite, con la
+    configuracion por defecto de SQLite y con SQLITE_PRAGMAS y transacciones
+    IMMEDIATE como en settings.
+
+    python manage.py test app.test.test_benchmark.test_sqlite_profile
+    """
+
+    EVENTS = 2_000
+    TICKETS = 200_000
+    READERS = 4
+    WRITERS = 4
+    SECONDS = 10
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _create(self, path):
+        db = sqlite3.connect(path)
+        db.executescript("""
+            CREATE TABLE event (id INTEGER PRIMARY KEY, title TEXT, scheduled_at TEXT, sold INTEGER, capacity INTEGER);
+            CREATE INDEX event_scheduled ON event (scheduled_at, id);
+            CREATE TABLE ticket (id INTEGER PRIMARY KEY, event_id INTEGER, user_id INTEGER, quantity INTEGER, code TEXT UNIQUE);
+            CREATE INDEX ticket_user ON ticket (user_id, id);
+        """)
+        db.executemany(
+            "INSERT INTO event VALUES (?, ?, ?, 0, 1000000)",
+            [(i, f"Evento {i}", f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}") for i in range(self.EVENTS)],
+        )
+        db.executemany(
+            "INSERT INTO ticket (event_id, user_id, quantity, code) VALUES (?, ?, 1, ?)",
+            [(i % self.EVENTS, i % 5_000, f"SEED{i}") for i in range(self.TICKETS)],
+        )
+        db.commit()
+        db.close()
+
+    def _connect(self, path, tuned):
+        if not tuned:
+            # Lo mismo que hacia Django antes: transacciones diferidas y timeout de 5s
+            return sqlite3.connect(path, timeout=5, isolation_level="DEFERRED", check_same_thread=False)
+        db = sqlite3.connect(path, isolation_level="IMMEDIATE", check_same_thread=False)
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            db.execute(f"PRAGMA {name} = {value}")
+        return db
+
+    def _run(self, tuned):
+        path = os.path.join(self.directory, f"{'tuned' if tuned else 'default'}.sqlite3")
+        self._create(path)
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + self.SECONDS
+
+        def reader(number):
+            db = self._connect(path, tuned)
+            rng = random.Random(number)
+            reads = 0
+            while time.monotonic() < deadline:
+                offset = rng.randrange(self.EVENTS - 20)
+                db.execute("SELECT id, title, sold FROM event ORDER BY scheduled_at, id LIMIT 20 OFFSET ?", (offset,)).fetchall()
+                db.execute("SELECT id, code FROM ticket WHERE user_id = ? ORDER BY id DESC LIMIT 20", (rng.randrange(5_000),)).fetchall()
+                # Las lecturas de Django no abren transaccion
+                db.commit()
+                reads += 1
+            with lock:
+                counts["reads"] += reads
+
+        def writer(number):
+            db = self._connect(path, tuned)
+            rng = random.Random(100 + number)
+            writes = locked = 0
+            while time.monotonic() < deadline:
+                event = rng.randrange(self.EVENTS)
+                try:
+                    # Como Ticket.purchase: primero se lee el evento, despues se escribe
+                    db.execute("SELECT sold, capacity FROM event WHERE id = ?", (event,)).fetchone()
+                    db.execute("UPDATE event SET sold = sold + 1 WHERE id = ? AND sold < capacity", (event,))
+                    db.execute(
+                        "INSERT INTO ticket (event_id, user_id, quantity, code) VALUES (?, ?, 1, ?)",
+                        (event, rng.randrange(5_000), f"W{number}-{writes}"),
+                    )
+                    db.commit()
+                    writes += 1
+                except sqlite3.OperationalError:
+                    db.rollback()
+                    locked += 1
+            with lock:
+                counts["writes"] += writes
+                counts["locked"] += locked
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(self.READERS)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(self.WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
+
+    def test_concurrent_reads_and_writes(self):
+        print()
+        for label, tuned in (("por defecto", False), ("SQLITE_PRAGMAS", True)):
+            counts = self._run(tuned)
+            print(
+                f"{label}: {counts['reads'] / self.SECONDS:,.0f} lecturas/s, "
+                f"{counts['writes'] / self.SECONDS:,.0f} compras/s, {counts['locked']} compras con la base bloqueada"
+            )
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Category, Event, Ticket, User, Venue
+from app.test.test_benchmark import benchmark
+
+
+@benchmark
+class TicketBulkIssueBenchmark(TestCase):
+    """Emision de 10.000 tickets en una sola llamada.
+
+    python manage.py test app.test.test_benchmark.test_ticket_bulk
+    """
+
+    TICKETS = 10_000
+    # Objetivo: unos pocos segundos
+    MAX_SECONDS = 5
+
+    def test_issue_ten_thousand_tickets(self):
+        User.objects.bulk_create([User(username=f"guest{i}") for i in range(1000)])
+        event = Event.objects.create(
+            title="Congreso",
+            description="Emision corporativa",
+            scheduled_at=timezone.now() + timedelta(days=30),
+            organizer=User.objects.create(username="organizer"),
+            category=Category.objects.create(name="Congresos"),
+            venue=Venue.objects.create(name="Centro", city="La Plata", address="Calle 3", capacity=20000, contact="x"),
+            general_capacity=self.TICKETS,
+            vip_capacity=self.TICKETS,
+        )
+        rows = [
+            (f"guest{i % 1000}", "VIP" if i % 5 == 0 else "GENERAL", 1)
+            for i in range(self.TICKETS)
+        ]
+
+        start = time.perf_counter()
+        results = Ticket.issue_bulk(event, rows)
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(result["error"] is None for result in results))
+        self.assertEqual(Ticket.objects.filter(event=event).count(), self.TICKETS)
+        print(f"\n{self.TICKETS} tickets emitidos en {elapsed:.2f}s ({self.TICKETS / elapsed:,.0f}/s)")
+        self.assertLess(elapsed, self.MAX_SECONDS)
@@ -0,0 +1,68 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Category, Event, Ticket, User, Venue
+from app.test.test_benchmark import benchmark
+
+
+@benchmark
+class TicketCodeBenchmark(TestCase):
+    """Compara el codigo uuid4 por ticket con los codigos asignados en bloque.
+
+    python manage.py test app.test.test_benchmark.test_ticket_codes
+    """
+
+    CODES = 50_000
+    TICKETS = 5_000
+
+    def setUp(self):
+        self.user = User.objects.create(username="bench")
+        self.event = Event.objects.create(
+            title="Benchmark",
+            description="Codigos de ticket",
+            scheduled_at=timezone.now() + timedelta(days=10),
+            organizer=User.objects.create(username="organizer"),
+            category=Category.objects.create(name="Bench"),
+            venue=Venue.objects.create(name="Sala", city="La Plata", address="Calle 1", capacity=10, contact="x"),
+            general_capacity=self.TICKETS * 2,
+        )
+
+    def _rate(self, label, count, fn):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {count / elapsed:,.0f}/s")
+
+    def test_code_generation_rate(self):
+        print()
+        self._rate("uuid4[:12] por codigo", self.CODES, lambda: [uuid.uuid4().hex[:12].upper() for _ in range(self.CODES)])
+        self._rate("Ticket.allocate_codes en bloque", self.CODES, lambda: Ticket.allocate_codes(self.CODES))
+        self._rate("Ticket.allocate_codes de a uno", self.CODES // 10, lambda: [Ticket.allocate_codes(1) for _ in range(self.CODES // 10)])
+
+    def test_insert_throughput(self):
+        def save_one_by_one():
+            for _ in range(self.TICKETS):
+                Ticket(
+                    user=self.user, event=self.event, quantity=1, type="GENERAL",
+                    ticket_code=uuid.uuid4().hex[:12].upper(),
+                ).save()
+
+        def bulk_with_allocated_codes():
+            Ticket.objects.bulk_create(
+                [
+                    Ticket(user=self.user, event=self.event, quantity=1, type="GENERAL", ticket_code=code)
+                    for code in Ticket.allocate_codes(self.TICKETS)
+                ],
+                batch_size=1000,
+            )
+
+        print()
+        self._rate("save() por ticket con uuid4", self.TICKETS, save_one_by_one)
+        self._rate("bulk_create con codigos en bloque", self.TICKETS, bulk_with_allocated_codes)
+        self.assertEqual(
+            Ticket.objects.values("ticket_code").distinct().count(), self.TICKETS * 2
+        )
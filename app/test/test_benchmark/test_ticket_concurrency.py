@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+from app.models import Ticket
+from app.test.base import BaseTicketSaleTest
+from app.test.test_benchmark import benchmark
+
+
+@benchmark
+class TicketConcurrentPurchaseBenchmark(BaseTicketSaleTest):
+    """Compras de 16 threads en paralelo contra el mismo evento. En SQLite escribe una
+    transaccion a la vez, asi que mide cuanto dura cada una con el lock tomado.
+
+    RUN_BENCHMARKS=True python manage.py test app.test.test_benchmark.test_ticket_concurrency
+    """
+
+    BUYERS = 1000
+    WORKERS = 16
+    GENERAL_CAPACITY = BUYERS
+    MIN_PURCHASES_PER_SECOND = 40
+
+    def _buy(self, user):
+        try:
+            Ticket.purchase(user, self.event, "GENERAL", 1)
+        finally:
+            connection.close()
+
+    def test_purchase_throughput(self):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            list(pool.map(self._buy, self.buyers))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), self.BUYERS)
+        throughput = self.BUYERS / elapsed
+        print(f"\n{self.BUYERS} compras concurrentes en {elapsed:.2f}s ({throughput:.0f} compras/s)")
+        self.assertGreaterEqual(throughput, self.MIN_PURCHASES_PER_SECOND)
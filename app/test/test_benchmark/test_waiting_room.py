@@ -0,0 +1,58 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+
+from app.models import Ticket
+from app.test.base import BaseTicketSaleTest
+from app.test.test_benchmark import benchmark
+from app.waiting_room import WaitingRoom
+
+
+@benchmark
+@override_settings(WAITING_ROOM_CONCURRENCY=4, WAITING_ROOM_HEARTBEAT_SECONDS=60)
+class WaitingRoomBenchmark(BaseTicketSaleTest):
+    """Salida a la venta con 400 compradores y 4 lugares en la sala de espera: como
+    nunca escriben mas de 4 compras a la vez, la latencia de cada compra (sin contar la
+    espera en la cola) no se dispara en la cola de la distribucion.
+
+    RUN_BENCHMARKS=True python manage.py test app.test.test_benchmark.test_waiting_room
+    """
+
+    BUYERS = 400
+    WORKERS = 64
+    GENERAL_CAPACITY = BUYERS
+    MAX_P99_MS = 250
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def _buy(self, user):
+        room = WaitingRoom(self.event.id)
+        number = room.join()
+        slot = room.admit(number)
+        while slot is None:
+            # Como la pagina de espera, consulta cada tanto y no en un loop sin pausa
+            time.sleep(0.05)
+            slot = room.admit(number)
+        try:
+            start = time.perf_counter()
+            Ticket.purchase(user, self.event, "GENERAL", 1)
+            return time.perf_counter() - start
+        finally:
+            room.leave(number, slot)
+            connection.close()
+
+    def test_purchase_latency_tail_is_bounded(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            latencies = sorted(pool.map(self._buy, self.buyers))
+
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), self.BUYERS)
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        print(f"\nCompra con sala de espera: p50 {p50:.1f}ms, p99 {p99:.1f}ms")
+        self.assertLessEqual(p99, self.MAX_P99_MS)
@@ -1,15 +1,17 @@
 import datetime
 import time
 
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.messages import get_messages
 
 from datetime import timedelta
-from app.models import Event, User, Category, Venue, Ticket
+from app.models import Comment, Event, User, Category, Rating, Venue, Ticket
+from app.query_budget import QueryBudgetAssertions
 
-class BaseEventTestCase(TestCase):
+class BaseEventTestCase(QueryBudgetAssertions, TestCase):
     """Clase base con la configuración común para todos los tests de eventos"""
 
     def setUp(self):
@@ -65,8 +67,9 @@ class EventsListViewTest(BaseEventTestCase):
         # Login con usuario regular
         self.client.login(username="regular", password="password123")
 
-        # Hacer petición a la vista events
-        response = self.client.get(reverse("events"))
+        # Hacer petición a la vista events, dentro de su presupuesto de consultas
+        with self.assertQueryBudget("events"):
+            response = self.client.get(reverse("events"))
 
         # Verificar respuesta
         self.assertEqual(response.status_code, 200)
@@ -139,8 +142,9 @@ class EventDetailViewTest(BaseEventTestCase):
         # Login con usuario regular
         self.client.login(username="regular", password="password123")
 
-        # Hacer petición a la vista event_detail
-        response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        # Hacer petición a la vista event_detail, dentro de su presupuesto de consultas
+        with self.assertQueryBudget("event_detail"):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
 
         # Verificar respuesta
         self.assertEqual(response.status_code, 200)
@@ -182,6 +186,60 @@ class EventDetailViewTest(BaseEventTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsNone(response.context['cuenta_regresiva'])
 
+    def test_event_detail_query_count_does_not_grow_with_comments_and_ratings(self):
+        self.client.login(username="regular", password="password123")
+
+        def add_activity(count):
+            for i in range(count):
+                author = User.objects.create_user(username=f"autor{Comment.objects.count()}", password="x")
+                Comment.objects.create(event=self.event1, user=author, title=f"Comentario {i}", text="Texto")
+                Rating.objects.create(event=self.event1, user=author, title=f"Resena {i}", text="Texto", rating=4)
+
+        # Sesion, usuario, evento con organizador/recinto/categoria, comentarios y calificaciones
+        add_activity(1)
+        with self.assertQueryBudget("event_detail"), self.assertNumQueries(5):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        self.assertContains(response, "autor0")
+
+        add_activity(10)
+        with self.assertQueryBudget("event_detail"), self.assertNumQueries(5):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        self.assertContains(response, "Comentarios (11)")
+        # Solo se muestra la primera pagina, empezando por el mas nuevo
+        self.assertEqual(len(response.context["comments"]), 10)
+        self.assertEqual(response.context["comments"][0].title, "Comentario 9")
+        self.assertIsNotNone(response.context["comments_cursor"])
+
+    def test_comment_and_rating_pages_follow_cursor(self):
+        authors = [User.objects.create_user(username=f"autor{i}", password="x") for i in range(25)]
+        Comment.objects.bulk_create([
+            Comment(event=self.event1, user=author, title=f"Comentario {i}", text="Texto")
+            for i, author in enumerate(authors)
+        ])
+        Rating.objects.bulk_create([
+            Rating(event=self.event1, user=author, title=f"Resena {i}", text="Texto", rating=3)
+            for i, author in enumerate(authors)
+        ])
+        self.client.login(username="regular", password="password123")
+
+        response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        for items, cursor_key, url_name in (
+            ("comments", "comments_cursor", "event_comments"),
+            ("ratings", "ratings_cursor", "rating_list_event"),
+        ):
+            seen = [item.id for item in response.context[items]]
+            cursor = response.context[cursor_key]
+            while cursor:
+                page = self.client.get(reverse(url_name, args=[self.event1.id]), {"after": cursor})
+                seen.extend(item.id for item in page.context[items])
+                cursor = page.context[cursor_key]
+
+            model = Comment if items == "comments" else Rating
+            self.assertEqual(
+                seen,
+                list(model.objects.filter(event=self.event1).order_by("-created_at", "-id").values_list("id", flat=True)),
+            )
+
     def test_event_detail_view_cuenta_regresiva_evento_pasado(self):
         evento_pasado = Event.objects.create(
             title="Evento pasado",
@@ -491,4 +549,159 @@ class FutureEventsViewTest(TestCase):
         self.assertContains(response, self.future_event.title)
 
         # Comprobar que el evento pasado NO está en la respuesta
-        self.assertNotContains(response, self.past_event.title)
\ No newline at end of file
+        self.assertNotContains(response, self.past_event.title)
+
+class EventsPaginationTest(BaseEventTestCase):
+    """Tests de la paginacion por cursor del listado de eventos"""
+
+    def _create_events(self, count):
+        Event.objects.bulk_create([
+            Event(
+                title=f"Evento extra {i}",
+                description="Relleno",
+                scheduled_at=timezone.now() + datetime.timedelta(days=3, minutes=i),
+                organizer=self.organizer,
+                category=Category.objects.get_or_create(name=f"Categoria {i % 3}")[0],
+                venue=self.venue,
+            )
+            for i in range(count)
+        ])
+
+    @override_settings(EVENT_FACETS_CACHE_SECONDS=0)
+    def test_query_count_does_not_grow_with_events(self):
+        self.client.login(username="regular", password="password123")
+        self.client.get(reverse("events"))
+
+        # Sesion, usuario, facetas agrupadas y la pagina: categorias y recintos salen
+        # del cache de datos de referencia
+        with self.assertQueryBudget("events"), self.assertNumQueries(4):
+            self.client.get(reverse("events"))
+
+        # Las categorias nuevas invalidan el cache: el primer listado las recarga
+        self._create_events(60)
+        self.client.get(reverse("events"))
+        with self.assertQueryBudget("events"), self.assertNumQueries(4):
+            self.client.get(reverse("events"))
+
+    def test_pages_follow_cursor_without_repeating_events(self):
+        self._create_events(60)
+        self.client.login(username="regular", password="password123")
+
+        seen = []
+        response = self.client.get(reverse("events"))
+        while True:
+            seen.extend(event.id for event in response.context["events"])
+            if not response.context["next_cursor"]:
+                break
+            response = self.client.get(reverse("events"), {"after": response.context["next_cursor"]})
+
+        expected = list(
+            Event.objects.filter(scheduled_at__gt=timezone.now()).order_by("scheduled_at", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 62)
+
+
+class EventsFilterTest(BaseEventTestCase):
+    """Tests de los filtros y facetas del listado de eventos"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.other_category = Category.objects.create(name="Teatro")
+        self.other_venue = Venue.objects.create(
+            name="Teatro Argentino", city="Buenos Aires", address="Av. 51", capacity=500, contact="x"
+        )
+        self.event3 = Event.objects.create(
+            title="Evento 3",
+            description="Descripción del evento 3",
+            scheduled_at=timezone.now() + datetime.timedelta(days=5),
+            organizer=self.organizer,
+            category=self.other_category,
+            venue=self.other_venue,
+            state="AVAILABLE",
+        )
+        self.client.login(username="regular", password="password123")
+
+    def test_filters_by_category_city_date_and_state(self):
+        response = self.client.get(reverse("events"), {"category": self.other_category.id})
+        self.assertEqual([e.id for e in response.context["events"]], [self.event3.id])
+
+        response = self.client.get(reverse("events"), {"city": "La Plata"})
+        self.assertEqual([e.id for e in response.context["events"]], [self.event1.id, self.event2.id])
+
+        tomorrow = (timezone.localtime() + datetime.timedelta(days=1)).date().isoformat()
+        response = self.client.get(reverse("events"), {"to": tomorrow})
+        self.assertEqual([e.id for e in response.context["events"]], [self.event1.id])
+
+        response = self.client.get(reverse("events"), {"state": "CANCELLED"})
+        self.assertEqual([e.id for e in response.context["events"]], [self.event2.id])
+
+    def test_facets_ignore_their_own_filter(self):
+        response = self.client.get(reverse("events"), {"city": "Buenos Aires"})
+        facets = response.context["facets"]
+
+        # Las categorias se cuentan dentro de la ciudad elegida, las ciudades sobre todo
+        self.assertEqual(facets["categories"], [(self.other_category.id, "Teatro", 1)])
+        self.assertEqual(facets["cities"], [("Buenos Aires", 1), ("La Plata", 2)])
+
+    def test_invalid_filters_are_ignored(self):
+        response = self.client.get(reverse("events"), {"category": "abc", "from": "ayer", "state": "X"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["events"]), 3)
+
+    def test_next_page_link_keeps_filters(self):
+        Event.objects.bulk_create([
+            Event(
+                title=f"Evento extra {i}",
+                description="Relleno",
+                scheduled_at=timezone.now() + datetime.timedelta(days=3, minutes=i),
+                organizer=self.organizer,
+                category=self.category,
+                venue=self.venue,
+            )
+            for i in range(30)
+        ])
+        response = self.client.get(reverse("events"), {"city": "La Plata"})
+
+        self.assertContains(response, "?city=La+Plata&amp;after=")
+
+    def test_text_search_orders_by_relevance_across_pages(self):
+        Event.objects.bulk_create([
+            Event(
+                title=f"Recital {i}" if i % 2 else f"Recital de rock {i}",
+                description="Rock en vivo" if i % 3 == 0 else "Música",
+                scheduled_at=timezone.now() + datetime.timedelta(days=4, minutes=i),
+                organizer=self.organizer,
+                category=self.category,
+                venue=self.venue,
+            )
+            for i in range(40)
+        ])
+
+        seen = []
+        response = self.client.get(reverse("events"), {"q": "rock"})
+        while True:
+            seen.extend(event.id for event in response.context["events"])
+            if not response.context["next_cursor"]:
+                break
+            response = self.client.get(reverse("events"), {"q": "rock", "after": response.context["next_cursor"]})
+
+        events, _ = Event.search(text="rock")
+        self.assertEqual(seen, list(events.order_by("search_rank", "id").values_list("id", flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertTrue(Event.objects.get(pk=seen[0]).title.startswith("Recital de rock"))
+
+    def test_sort_by_rating(self):
+        voters = [User.objects.create_user(username=f"votante{i}", password="x") for i in range(2)]
+        for event, values in ((self.event1, (3, 4)), (self.event3, (5, 5))):
+            for voter, value in zip(voters, values):
+                Rating.objects.create(event=event, user=voter, title="Resena", text="Texto", rating=value)
+
+        response = self.client.get(reverse("events"), {"sort": "rating"})
+
+        self.assertEqual(
+            [e.id for e in response.context["events"]], [self.event3.id, self.event1.id, self.event2.id]
+        )
+        self.assertContains(response, "3,5 (2)")
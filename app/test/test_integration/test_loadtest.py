@@ -0,0 +1,20 @@
+from django.test import LiveServerTestCase, override_settings
+
+from app import seed
+from app.loadtest import runner
+
+
+@override_settings(SESSION_COOKIE_SECURE=False, CSRF_COOKIE_SECURE=False)
+class LoadTestRunnerTest(LiveServerTestCase):
+    def test_scenarios_run_against_live_server(self):
+        seed.generate(
+            users=2, organizers=1, categories=2, venues=2, events=30, tickets=20, comments=10, ratings=10
+        )
+
+        result = runner.run(self.live_server_url, users=1, duration=2)
+
+        self.assertEqual(set(result["scenarios"]), {"browse", "buy"})
+        for step in ("events", "event_detail", "ticket_form", "ticket_purchase", "ticket_list"):
+            self.assertGreater(result["steps"][step]["count"], 0, step)
+        self.assertEqual(sum(summary["errors"] for summary in result["steps"].values()), 0)
+        self.assertIsNotNone(result["scenarios"]["buy"]["p95_ms"])
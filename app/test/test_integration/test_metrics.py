@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app import metrics
+from app.models import User
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN="token-de-prometheus")
+class MetricsTest(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        User.objects.create_user(username="usuario", password="password123", is_staff=True)
+        self.client.login(username="usuario", password="password123")
+
+    def test_requests_are_exposed_in_prometheus_format(self):
+        self.client.get(reverse("events"))
+        self.client.get(reverse("events"))
+        self.client.get("/no-existe/")
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        text = response.content.decode()
+
+        self.assertIn("# TYPE eventhub_http_request_duration_seconds histogram", text)
+        self.assertIn('eventhub_http_requests_total{method="GET",status="200",view="events"} 2', text)
+        self.assertIn('eventhub_http_requests_total{method="GET",status="404",view="<sin ruta>"} 1', text)
+        self.assertIn('eventhub_http_request_duration_seconds_bucket{view="events",le="+Inf"} 2', text)
+        self.assertIn('eventhub_http_request_duration_seconds_count{view="events"} 2', text)
+        self.assertIn('eventhub_template_render_duration_seconds_count{view="events"} 2', text)
+        self.assertIn('eventhub_db_queries_total{view="events"}', text)
+
+    def test_values_from_other_processes_are_added(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            with open(os.path.join(directory, "otro-host-1.json"), "w") as file:
+                json.dump(
+                    [["eventhub_http_requests_total", [["method", "GET"], ["status", "200"], ["view", "events"]], 5]],
+                    file,
+                )
+            self.client.get(reverse("events"))
+
+            text = self.client.get(reverse("metrics")).content.decode()
+            self.assertIn('eventhub_http_requests_total{method="GET",status="200",view="events"} 6', text)
+            # Este proceso tambien dejo su archivo para los demas
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_endpoint_is_hidden_when_disabled(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    def test_endpoint_needs_staff_or_token(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), headers={"Authorization": "Bearer otro-token"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse("metrics"), headers={"Authorization": "Bearer token-de-prometheus"})
+        self.assertEqual(response.status_code, 200)
+
+        User.objects.create_user(username="comprador", password="password123")
+        self.client.login(username="comprador", password="password123")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Category, Comment, Event, Ticket, User, Venue
+from app.query_budget import QueryBudgetAssertions
+
+
+class QueryBudgetTest(QueryBudgetAssertions, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="comprador", password="password123")
+        organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        category = Category.objects.create(name="Música")
+        venue = Venue.objects.create(name="Estadio", city="La Plata", address="Av. 32", capacity=1000, contact="x")
+        self.events = [
+            Event.objects.create(
+                title=f"Evento {i}",
+                description="Descripcion",
+                scheduled_at=timezone.now() + timedelta(days=i + 1),
+                organizer=organizer,
+                category=category,
+                venue=venue,
+            )
+            for i in range(5)
+        ]
+        for event in self.events:
+            self.ticket = Ticket.objects.create(user=self.user, event=event, type="GENERAL", quantity=1)
+            Comment.objects.create(user=self.user, event=event, title="Bueno", text="Muy bueno")
+        self.client.login(username="comprador", password="password123")
+
+    def test_lists_stay_within_budget(self):
+        for url_name, args in (
+            ("ticket_list", []),
+            ("comment_list", []),
+            ("ticket_detail", [self.ticket.pk]),
+            ("events", []),
+            ("event_detail", [self.events[0].pk]),
+        ):
+            with self.subTest(url_name), self.assertQueryBudget(url_name):
+                response = self.client.get(reverse(url_name, args=args))
+            self.assertEqual(response.status_code, 200)
+
+    def test_assertion_fails_over_budget(self):
+        with override_settings(QUERY_BUDGETS={"ticket_list": 1}):
+            with self.assertRaisesMessage(AssertionError, "ticket_list hizo 3 consultas"):
+                with self.assertQueryBudget("ticket_list"):
+                    self.client.get(reverse("ticket_list"))
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGETS={"ticket_list": 1})
+    def test_middleware_reports_and_flags_views_over_budget(self):
+        with self.assertLogs("app.query_budget", "WARNING") as logs:
+            response = self.client.get(reverse("ticket_list"))
+        self.assertEqual(response["X-Query-Count"], "3")
+        self.assertIn("X-Query-Time-Ms", response)
+        self.assertEqual(response["X-Query-Budget-Exceeded"], "1")
+        self.assertIn("ticket_list hizo 3 consultas", logs.output[0])
+
+        response = self.client.get(reverse("comment_list"))
+        self.assertNotIn("X-Query-Budget-Exceeded", response)
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_middleware_is_skipped_when_disabled(self):
+        response = self.client.get(reverse("ticket_list"))
+        self.assertNotIn("X-Query-Count", response)
@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from app.database import STICKY_SESSION_KEY, parse_database_url
+from app.models import Category, User
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_REPLICA_STICKY_SECONDS=60)
+class ReplicaRouterTest(TransactionTestCase):
+    """El primario es la base de los tests y la replica otro archivo SQLite con datos
+    distintos, asi se ve de que base sale cada lectura."""
+
+    def setUp(self):
+        # Conexion creada en el test (no esta en DATABASES) a un archivo nuevo
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = parse_database_url(f"sqlite:///{os.path.join(directory.name, 'replica.sqlite3')}")
+        config = connections.configure_settings({DEFAULT_DB_ALIAS: config})[DEFAULT_DB_ALIAS]
+        connections["replica"] = load_backend(config["ENGINE"]).DatabaseWrapper(config, "replica")
+        self.addCleanup(self._remove_replica)
+        call_command("migrate", database="replica", verbosity=0)
+
+        self.user = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        replica_user = User.objects.get(pk=self.user.pk)
+        replica_user.save(using="replica", force_insert=True)
+        Category.objects.create(name="Solo en el primario")
+        Category.objects.using("replica").create(name="Solo en la replica")
+        self.client.force_login(self.user)
+
+    def _remove_replica(self):
+        connections["replica"].close()
+        del connections["replica"]
+
+    def test_browsing_reads_from_the_replica(self):
+        response = self.client.get(reverse("categoria"))
+        self.assertContains(response, "Solo en la replica")
+        self.assertNotContains(response, "Solo en el primario")
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        response = self.client.post(
+            reverse("create_categoria"), {"name": "Nueva", "description": "Recien creada", "is_active": "true"}
+        )
+        self.assertRedirects(response, reverse("categoria"), fetch_redirect_response=False)
+
+        response = self.client.get(reverse("categoria"))
+        self.assertContains(response, "Nueva")
+        self.assertContains(response, "Solo en el primario")
+
+        # Pasada la ventana vuelve a leer de la replica
+        session = self.client.session
+        session[STICKY_SESSION_KEY] = time.time() - 1
+        session.save()
+        response = self.client.get(reverse("categoria"))
+        self.assertContains(response, "Solo en la replica")
+
+    def test_request_reads_from_a_single_replica(self):
+        # El listado lee varias veces (usuario, facetas, eventos): la replica se elige una vez
+        with mock.patch("app.database.random.choice", wraps=random.choice) as choice:
+            response = self.client.get(reverse("events"))
+        self.assertEqual(response.status_code, 200)
+        choice.assert_called_once_with(["replica"])
@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase, Client
 from django.urls import reverse
-from app.models import User, Event, Venue, Category, Ticket
+from app.models import User, Event, Venue, Category, Ticket, TicketHold, IdempotencyKey
 from django.utils import timezone
 from datetime import timedelta
 
@@ -88,3 +92,168 @@ class TicketEditLimitTest(TestCase):
         # Verificamos que la cantidad del ticket no haya cambiado (sigue 3)
         ticket1.refresh_from_db()
         self.assertEqual(ticket1.quantity, 3)
+
+
+class TicketBulkIssueViewTest(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass", is_organizer=True)
+        self.buyer = User.objects.create_user(username="buyer", password="pass")
+        self.event = Event.objects.create(
+            title="Evento corporativo",
+            description="Entradas para sponsors",
+            scheduled_at=timezone.now() + timedelta(days=10),
+            organizer=self.organizer,
+            category=Category.objects.create(name="Empresas"),
+            venue=Venue.objects.create(name="Salon", city="La Plata", address="Calle 2", capacity=100, contact="x"),
+            general_capacity=10,
+            vip_capacity=5,
+        )
+        self.url = reverse("ticket_bulk_issue", args=[self.event.id])
+
+    def test_organizer_issues_tickets_from_rows(self):
+        self.client.login(username="organizer", password="pass")
+
+        response = self.client.post(self.url, {"rows": "buyer,GENERAL,3\nbuyer,VIP,9\n"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Se emitieron 1 tickets.")
+        self.assertContains(response, "Solo quedan 5")
+        self.assertEqual(Ticket.objects.filter(event=self.event, user=self.buyer).count(), 1)
+
+    def test_header_row_is_skipped(self):
+        self.client.login(username="organizer", password="pass")
+
+        response = self.client.post(self.url, {"rows": "usuario,tipo,cantidad\nbuyer,GENERAL,3\n"})
+
+        self.assertContains(response, "Se emitieron 1 tickets.")
+        self.assertNotContains(response, "filas no se pudieron emitir")
+
+    def test_csv_file_encodings(self):
+        self.client.login(username="organizer", password="pass")
+
+        bom = SimpleUploadedFile("filas.csv", "buyer,GENERAL,2\n".encode("utf-8-sig"), content_type="text/csv")
+        response = self.client.post(self.url, {"csv_file": bom})
+        self.assertContains(response, "Se emitieron 1 tickets.")
+
+        latin1 = SimpleUploadedFile("filas.csv", "buyer,GENERAL,1,Año\n".encode("latin-1"), content_type="text/csv")
+        response = self.client.post(self.url, {"csv_file": latin1})
+        self.assertContains(response, "El archivo tiene que estar guardado como CSV UTF-8.")
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+
+    def test_cancelled_event_rejects_upload(self):
+        Event.objects.filter(pk=self.event.pk).update(state="CANCELLED")
+        self.client.login(username="organizer", password="pass")
+
+        response = self.client.post(self.url, {"rows": "buyer,GENERAL,3"})
+
+        self.assertContains(response, "No se pueden emitir tickets porque el evento está Cancelado.")
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_only_event_organizer_can_issue(self):
+        self.client.login(username="buyer", password="pass")
+
+        response = self.client.post(self.url, {"rows": "buyer,GENERAL,3"})
+
+        self.assertRedirects(response, reverse("events"))
+        self.assertFalse(Ticket.objects.exists())
+
+
+class TicketIdempotencyTest(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.buyer = User.objects.create_user(username="buyer", password="pass")
+        self.client.login(username="buyer", password="pass")
+        self.event = Event.objects.create(
+            title="Evento",
+            description="Compra con reintentos",
+            scheduled_at=timezone.now() + timedelta(days=10),
+            organizer=self.organizer,
+            category=Category.objects.create(name="Recitales"),
+            venue=Venue.objects.create(name="Estadio", city="La Plata", address="Calle 1", capacity=100, contact="x"),
+            general_capacity=10,
+            vip_capacity=5,
+        )
+        self.url = reverse("ticket_form", args=[self.event.id])
+
+    def test_duplicate_submit_replays_first_response(self):
+        data = {"quantity": 2, "type": "GENERAL", "idempotency_key": "abc123"}
+
+        first = self.client.post(self.url, data)
+        second = self.client.post(self.url, data)
+
+        self.assertRedirects(first, reverse("ticket_list"))
+        self.assertRedirects(second, reverse("ticket_list"))
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Ticket.objects.filter(user=self.buyer).count(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.general_sold, 2)
+
+    def test_form_errors_do_not_consume_the_key(self):
+        response = self.client.post(self.url, {"quantity": 0, "type": "GENERAL", "idempotency_key": "k1"})
+        self.assertContains(response, "La cantidad debe ser mayor a cero.")
+
+        response = self.client.post(self.url, {"quantity": 1, "type": "GENERAL", "idempotency_key": "k1"})
+        self.assertRedirects(response, reverse("ticket_list"))
+        self.assertEqual(Ticket.objects.filter(user=self.buyer).count(), 1)
+
+    def test_expired_keys_are_purged(self):
+        self.client.post(self.url, {"quantity": 1, "type": "GENERAL", "idempotency_key": "old"})
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class TicketHoldCheckoutTest(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.buyer = User.objects.create_user(username="buyer", password="pass")
+        self.client.login(username="buyer", password="pass")
+        self.event = Event.objects.create(
+            title="Evento",
+            description="Compra en dos pasos",
+            scheduled_at=timezone.now() + timedelta(days=10),
+            organizer=self.organizer,
+            category=Category.objects.create(name="Recitales"),
+            venue=Venue.objects.create(name="Estadio", city="La Plata", address="Calle 1", capacity=100, contact="x"),
+            general_capacity=10,
+            vip_capacity=2,
+        )
+        self.url = reverse("ticket_form", args=[self.event.id])
+
+    def test_reserve_then_pay(self):
+        response = self.client.post(self.url, {"quantity": 2, "type": "VIP", "action": "reserve"})
+        hold = TicketHold.objects.get(user=self.buyer)
+        self.assertRedirects(response, reverse("ticket_hold", args=[hold.id]))
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.vip_sold, self.event.state), (2, "AVAILABLE"))
+
+        response = self.client.get(reverse("ticket_hold", args=[hold.id]))
+        self.assertContains(response, "Pagar reserva")
+
+        response = self.client.post(reverse("ticket_hold", args=[hold.id]))
+        self.assertRedirects(response, reverse("ticket_list"))
+        self.assertEqual(Ticket.objects.get(user=self.buyer).quantity, 2)
+        self.assertFalse(TicketHold.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.vip_sold, 2)
+
+    def test_cancelled_event_and_released_holds(self):
+        self.client.post(self.url, {"quantity": 1, "type": "GENERAL", "action": "reserve"})
+        hold = TicketHold.objects.get(user=self.buyer)
+        response = self.client.post(reverse("ticket_hold_release", args=[hold.id]))
+        self.assertRedirects(response, reverse("event_detail", args=[self.event.id]))
+        self.assertFalse(TicketHold.objects.exists())
+
+        self.client.post(self.url, {"quantity": 1, "type": "GENERAL", "action": "reserve"})
+        hold = TicketHold.objects.get(user=self.buyer)
+        Event.objects.filter(pk=self.event.pk).update(state="CANCELLED")
+        response = self.client.post(reverse("ticket_hold", args=[hold.id]))
+        self.assertRedirects(response, reverse("event_detail", args=[self.event.id]))
+        self.assertFalse(Ticket.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.general_sold, 0)
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.db.models import Sum
+
+from app.models import Ticket
+from app.test.base import BaseTicketSaleTest
+
+
+class TicketConcurrentPurchaseTest(BaseTicketSaleTest):
+    """Dispara cientos de compras en paralelo y verifica que nunca se sobrevende"""
+
+    BUYERS = 300
+    WORKERS = 16
+    GENERAL_CAPACITY = 100
+    VIP_CAPACITY = 20
+
+    def _buy(self, user, type):
+        try:
+            ticket, _ = Ticket.purchase(user, self.event, type, 1)
+            return ticket is not None
+        finally:
+            connection.close()
+
+    def test_parallel_purchases_never_oversell(self):
+        jobs = [(buyer, "VIP" if i % 4 == 0 else "GENERAL") for i, buyer in enumerate(self.buyers)]
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(lambda job: self._buy(*job), jobs))
+
+        self.event.refresh_from_db()
+        sold = {
+            type: Ticket.objects.filter(event=self.event, type=type).aggregate(total=Sum("quantity"))["total"] or 0
+            for type in ("GENERAL", "VIP")
+        }
+
+        # Se vende justo el cupo (hay mas compradores que entradas) y los contadores
+        # coinciden con los tickets
+        self.assertEqual(sold["GENERAL"], self.event.general_capacity)
+        self.assertEqual(sold["VIP"], self.event.vip_capacity)
+        self.assertEqual(self.event.general_sold, sold["GENERAL"])
+        self.assertEqual(self.event.vip_sold, sold["VIP"])
+        self.assertEqual(self.event.state, "SOLD_OUT")
+        self.assertEqual(sum(results), sold["GENERAL"] + sold["VIP"])
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), sum(results))
@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from app.models import Ticket, User
+from app.test.base import BaseTicketSaleTest, create_sale_event
+from app.waiting_room import WaitingRoom
+
+
+@override_settings(WAITING_ROOM_CONCURRENCY=1)
+class WaitingRoomViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.event = create_sale_event(self.organizer)
+        self.first = Client()
+        self.second = Client()
+        for i, client in enumerate((self.first, self.second)):
+            client.force_login(User.objects.create_user(username=f"buyer{i}", password="pass"))
+
+    def test_second_buyer_waits_until_first_finishes(self):
+        url = reverse("ticket_form", args=[self.event.id])
+
+        response = self.first.get(url)
+        self.assertTemplateUsed(response, "app/ticket_form.html")
+
+        response = self.second.get(url)
+        self.assertTemplateUsed(response, "app/waiting_room.html")
+        status = self.second.get(reverse("waiting_room_status", args=[self.event.id])).json()
+        self.assertFalse(status["admitted"])
+
+        response = self.first.post(url, {"quantity": 1, "type": "GENERAL"})
+        self.assertRedirects(response, reverse("ticket_list"))
+
+        status = self.second.get(reverse("waiting_room_status", args=[self.event.id])).json()
+        self.assertTrue(status["admitted"])
+        response = self.second.get(url)
+        self.assertTemplateUsed(response, "app/ticket_form.html")
+
+    def test_abandoned_place_in_queue_is_skipped(self):
+        room = WaitingRoom(self.event.id)
+        first, second, third = room.join(), room.join(), room.join()
+        self.assertEqual(room.admit(first), 0)
+        room.leave(first, 0)
+
+        # El segundo deja de consultar y su heartbeat vence
+        cache.delete(room._key("alive", second))
+        self.assertEqual(room.admit(third), 0)
+
+
+@override_settings(WAITING_ROOM_CONCURRENCY=4, WAITING_ROOM_HEARTBEAT_SECONDS=60)
+class WaitingRoomLoadTest(BaseTicketSaleTest):
+    """Simula una salida a la venta: cientos de compradores pasan por la sala de espera
+    y nunca hay mas compras escribiendo en la base que lugares admitidos"""
+
+    BUYERS = 200
+    WORKERS = 32
+    GENERAL_CAPACITY = 150
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _buy(self, user):
+        room = WaitingRoom(self.event.id)
+        number = room.join()
+        slot = room.admit(number)
+        while slot is None:
+            time.sleep(0.001)
+            slot = room.admit(number)
+
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            Ticket.purchase(user, self.event, "GENERAL", 1)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            room.leave(number, slot)
+            connection.close()
+
+    def test_admitted_purchases_are_bounded(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            list(pool.map(self._buy, self.buyers))
+
+        self.assertLessEqual(self.max_in_flight, 4)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.general_sold, Ticket.objects.filter(event=self.event).count())
+        self.assertEqual(self.event.general_sold, self.event.general_capacity)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import ArchivedEvent, Category, Comment, Event, Rating, Ticket, User, Venue
+
+
+class ArchivedEventTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username="organizador", password="password123", is_organizer=True
+        )
+        self.buyer = User.objects.create_user(username="comprador", password="password123")
+        category = Category.objects.create(name="Música")
+        venue = Venue.objects.create(name="Estadio", city="La Plata", address="Av. 32", capacity=1000, contact="x")
+
+        def event(days, state):
+            return Event.objects.create(
+                title=f"Evento {state} {days}",
+                description="Descripcion",
+                scheduled_at=timezone.now() + timedelta(days=days),
+                organizer=self.organizer,
+                category=category,
+                venue=venue,
+                state=state,
+            )
+
+        self.old = event(-400, "FINISHED")
+        self.older = event(-500, "FINISHED")
+        self.recent = event(-10, "FINISHED")
+        self.old_cancelled = event(-400, "CANCELLED")
+
+        for current in (self.old, self.recent):
+            Ticket.objects.create(user=self.buyer, event=current, type="VIP", quantity=2)
+            Comment.objects.create(user=self.buyer, event=current, title="Bueno", text="Muy bueno")
+            Rating.objects.create(user=self.buyer, event=current, title="Genial", text="Genial", rating=4)
+
+    def test_archives_old_finished_events_with_their_rows(self):
+        self.assertEqual(ArchivedEvent.archive_finished(), 2)
+
+        self.assertEqual(
+            set(Event.objects.values_list("pk", flat=True)), {self.recent.pk, self.old_cancelled.pk}
+        )
+        self.assertFalse(Ticket.objects.filter(event_id=self.old.pk).exists())
+        self.assertFalse(Comment.objects.filter(event_id=self.old.pk).exists())
+        self.assertFalse(Rating.objects.filter(event_id=self.old.pk).exists())
+        self.assertEqual(Ticket.objects.filter(event=self.recent).count(), 1)
+
+        archived = ArchivedEvent.objects.get(pk=self.old.pk)
+        self.assertEqual((archived.title, archived.venue_city, archived.vip_sold), (self.old.title, "La Plata", 2))
+        self.assertEqual((archived.rating_count, archived.rating_average), (1, 4.0))
+        self.assertEqual([t["username"] for t in archived.tickets], ["comprador"])
+        self.assertEqual(archived.comments[0]["text"], "Muy bueno")
+        self.assertIsNotNone(archived.ratings[0]["created_at"].tzinfo)
+
+        self.assertEqual(ArchivedEvent.archive_finished(), 0)
+
+    def test_archives_in_batches(self):
+        self.assertEqual(ArchivedEvent.archive_finished(batch_size=1), 2)
+        self.assertEqual(ArchivedEvent.objects.count(), 2)
+
+    def test_organizer_can_view_archived_events(self):
+        ArchivedEvent.archive_finished()
+        self.client.login(username="organizador", password="password123")
+
+        response = self.client.get(reverse("archived_events"))
+        self.assertEqual([e.pk for e in response.context["events"]], [self.old.pk, self.older.pk])
+
+        response = self.client.get(reverse("archived_event_detail", args=[self.old.pk]))
+        self.assertContains(response, "Muy bueno")
+        self.assertContains(response, "comprador")
+
+        # El link viejo del evento lleva al archivo
+        response = self.client.get(reverse("event_detail", args=[self.old.pk]))
+        self.assertRedirects(response, reverse("archived_event_detail", args=[self.old.pk]))
+
+    def test_other_users_cannot_view_archived_events(self):
+        ArchivedEvent.archive_finished()
+        self.client.login(username="comprador", password="password123")
+
+        response = self.client.get(reverse("archived_event_detail", args=[self.old.pk]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("event_detail", args=[self.old.pk]))
+        self.assertEqual(response.status_code, 404)
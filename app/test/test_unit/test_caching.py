@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from app import metrics
+from app.caching import FileBasedCache, hit_stats, parse_cache_url
+
+
+class CacheUrlTest(SimpleTestCase):
+    def test_local_and_file_urls(self):
+        config = parse_cache_url("locmem://", key_prefix="eventhub", version=2, timeout=60)
+        self.assertEqual(config["BACKEND"], "app.caching.LocMemCache")
+        self.assertEqual(
+            (config["LOCATION"], config["KEY_PREFIX"], config["VERSION"], config["TIMEOUT"]),
+            ("eventhub", "eventhub", 2, 60),
+        )
+        config = parse_cache_url("file:////var/cache/eventhub?max_entries=1000")
+        self.assertEqual(config["BACKEND"], "app.caching.FileBasedCache")
+        self.assertEqual(config["LOCATION"], "/var/cache/eventhub")
+        self.assertEqual(config["OPTIONS"], {"max_entries": 1000})
+
+    def test_redis_url_is_passed_to_the_client(self):
+        config = parse_cache_url("rediss://:clave@cache.local:6380/2")
+        self.assertEqual(config["BACKEND"], "app.caching.RedisCache")
+        self.assertEqual(config["LOCATION"], "rediss://:clave@cache.local:6380/2")
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ImproperlyConfigured):
+            parse_cache_url("memcached://localhost:11211")
+
+
+class CacheStatsTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.clear()
+
+    def test_hits_and_misses_by_namespace(self):
+        cache.set("event_facets:a", [])
+        cache.get("event_facets:a")
+        cache.get("event_facets:b")
+        cache.get_many(["reference:x", "event_facets:a"])
+
+        self.assertEqual(
+            hit_stats(metrics.registry.snapshot()),
+            {"event_facets": (2, 1), "reference": (0, 1)},
+        )
+
+    def test_command_reads_the_workers_files(self):
+        cache.set("event_facets:a", [])
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            for worker, hits in (("web-1", 2), ("web-2", 1)):
+                with open(os.path.join(directory, f"{worker}.json"), "w") as file:
+                    json.dump(
+                        [
+                            ["eventhub_cache_requests_total", [["namespace", "event_facets"], ["result", "hit"]], hits],
+                            ["eventhub_cache_requests_total", [["namespace", "event_facets"], ["result", "miss"]], 1],
+                        ],
+                        file,
+                    )
+
+            output = StringIO()
+            call_command("cache_stats", stdout=output)
+            # El comando no deja un archivo propio en el directorio de los workers
+            self.assertEqual(sorted(os.listdir(directory)), ["web-1.json", "web-2.json"])
+
+        self.assertIn("Backend: app.caching.LocMemCache", output.getvalue())
+        self.assertIn("Claves guardadas: 1", output.getvalue())
+        self.assertIn("event_facets: 3 aciertos, 2 fallos (60.0% de aciertos)", output.getvalue())
+
+    @override_settings(METRICS_MULTIPROC_DIR="")
+    def test_command_needs_the_workers_directory(self):
+        with self.assertRaisesMessage(CommandError, "METRICS_MULTIPROC_DIR"):
+            call_command("cache_stats", stdout=StringIO())
+
+    def test_file_cache_counts_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_cache = FileBasedCache(directory, {})
+            file_cache.set("reference:categories:version", "v1")
+            self.assertEqual(file_cache.get("reference:categories:version"), "v1")
+            self.assertIsNone(file_cache.get("reference:venues:version"))
+            self.assertEqual(file_cache.entry_count(), 1)
+        self.assertEqual(hit_stats(metrics.registry.snapshot()), {"reference": (1, 1)})
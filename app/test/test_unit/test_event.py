@@ -4,7 +4,7 @@ from unittest.mock import patch
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.auth.models import User
-from app.models import Event, Ticket, Category, Venue, User
+from app.models import Event, Rating, Ticket, Category, Venue, User
 from django.urls import reverse
 from datetime import timedelta  # <--- esta línea nueva
 
@@ -317,3 +317,122 @@ class EventViewTest(TestCase):
         self.assertEqual(future_events.count(), 1)
         self.assertEqual(future_events.first().title, "Evento Futuro")
         self.assertTrue(all(event.scheduled_at > timezone.now() for event in future_events))
+
+
+class EventTextSearchTest(TestCase):
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizador_busqueda", password="password123")
+        category = Category.objects.create(name="Música")
+        venue = Venue.objects.create(name="Estadio", city="La Plata", address="Av. 32", capacity=1000, contact="x")
+        self.defaults = {
+            "scheduled_at": timezone.now() + timedelta(days=1),
+            "organizer": organizer,
+            "category": category,
+            "venue": venue,
+        }
+
+    def _search(self, text):
+        events, _ = Event.search(text=text)
+        return list(events.order_by("search_rank", "id").values_list("title", flat=True))
+
+    def test_index_follows_create_update_and_delete(self):
+        event = Event.objects.create(title="Festival de jazz", description="Música en vivo", **self.defaults)
+        self.assertEqual(self._search("jazz"), ["Festival de jazz"])
+
+        event.title = "Festival de tango"
+        event.save()
+        self.assertEqual(self._search("jazz"), [])
+        self.assertEqual(self._search("tango"), ["Festival de tango"])
+
+        event.delete()
+        self.assertEqual(self._search("tango"), [])
+
+    def test_bulk_created_events_are_indexed(self):
+        Event.objects.bulk_create([
+            Event(title=f"Obra {i}", description="Teatro independiente", **self.defaults) for i in range(3)
+        ])
+
+        self.assertEqual(len(self._search("teatro")), 3)
+
+    def test_ranks_prefix_and_accent_insensitive_matches(self):
+        Event.objects.create(title="Charla", description="Rock nacional en la biblioteca", **self.defaults)
+        Event.objects.create(title="Rock en el estadio", description="Recital de rock", **self.defaults)
+
+        self.assertEqual(self._search("roc"), ["Rock en el estadio", "Charla"])
+        self.assertEqual(self._search("BIBLIÓTECA"), ["Charla"])
+        # Los operadores y signos de FTS5 se ignoran
+        self.assertEqual(self._search('rock" (*'), ["Rock en el estadio", "Charla"])
+
+
+class EventRatingSummaryTest(TestCase):
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizador_ratings", password="password123")
+        self.event = Event.objects.create(
+            title="Evento calificado",
+            description="Descripcion",
+            scheduled_at=timezone.now() + timedelta(days=1),
+            organizer=organizer,
+            category=Category.objects.create(name="Música"),
+            venue=Venue.objects.create(name="Estadio", city="La Plata", address="Av. 32", capacity=1000, contact="x"),
+        )
+        self.users = [User.objects.create_user(username=f"votante{i}", password="x") for i in range(3)]
+
+    def _rate(self, user, value):
+        return Rating.objects.create(event=self.event, user=user, title="Resena", text="Texto", rating=value)
+
+    def test_summary_follows_create_edit_and_delete(self):
+        first = self._rate(self.users[0], 5)
+        self._rate(self.users[1], 2)
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_sum), (2, 7))
+        self.assertEqual(self.event.rating_average, 3.5)
+        self.assertEqual([total for _, total, _ in self.event.rating_histogram], [1, 0, 0, 1, 0])
+
+        first.rating = 3
+        first.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_average, 2.5)
+        self.assertEqual((self.event.rating_5, self.event.rating_3), (0, 1))
+
+        first.delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_sum, self.event.rating_3), (1, 2, 0))
+
+        Rating.objects.get(event=self.event).delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_average), (0, 0))
+
+    def test_cascade_and_queryset_deletes_update_summary(self):
+        for user, value in zip(self.users, (5, 4, 4)):
+            self._rate(user, value)
+
+        self.users[0].delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_5, self.event.rating_average), (2, 0, 4.0))
+
+        Rating.objects.filter(event=self.event).delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_sum, self.event.rating_4), (0, 0, 0))
+        self.assertEqual(Event.reconcile_ratings(), 0)
+
+    def test_editing_event_does_not_overwrite_summary(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        self._rate(self.users[0], 4)
+
+        stale.title = "Otro titulo"
+        stale.save()
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_4), (1, 1))
+
+    def test_reconcile_ratings_fixes_drift(self):
+        for user, value in zip(self.users, (1, 4, 4)):
+            self._rate(user, value)
+        Event.objects.filter(pk=self.event.pk).update(rating_count=0, rating_sum=0, rating_4=7, rating_average=0)
+
+        self.assertEqual(Event.reconcile_ratings(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.rating_count, self.event.rating_sum, self.event.rating_4), (3, 9, 2))
+        self.assertEqual(self.event.rating_average, 3.0)
+        self.assertEqual(Event.reconcile_ratings(), 0)
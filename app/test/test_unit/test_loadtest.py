@@ -0,0 +1,14 @@
+from django.test import TestCase
+
+from app.loadtest.runner import percentile, summarize
+
+
+class LoadTestStatsTest(TestCase):
+    def test_percentiles_use_nearest_rank(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 0.05)
+        self.assertEqual(percentile(samples, 99), 0.099)
+        self.assertIsNone(percentile([], 95))
+
+        summary = summarize(samples, errors=2, duration=10)
+        self.assertEqual((summary["count"], summary["throughput"], summary["p95_ms"]), (100, 10.0, 95.0))
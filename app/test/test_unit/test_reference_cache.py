@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from app import reference_cache
+from app.models import Category, Venue
+
+
+class ReferenceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reference_cache.clear_local()
+        self.category = Category.objects.create(name="Rock")
+        self.venue = Venue.objects.create(name="Estadio", city="La Plata", address="Calle 1", capacity=100, contact="x")
+
+    def test_warm_reads_do_not_query(self):
+        self.assertEqual(list(Category.cached()), [self.category.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(Category.cached()[self.category.pk].name, "Rock")
+
+    def test_new_worker_reads_shared_tier(self):
+        Venue.cached()
+        reference_cache.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(Venue.cached()[self.venue.pk].city, "La Plata")
+
+    def test_changes_invalidate(self):
+        Category.cached()
+        Venue.cached()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.new("Jazz", "Musica", True)
+            self.category.update("Rock nacional", None, None)
+            self.venue.delete()
+
+        self.assertEqual(sorted(c.name for c in Category.cached().values()), ["Jazz", "Rock nacional"])
+        self.assertEqual(Venue.cached(), {})
+
+    def test_version_changed_by_other_worker_reloads(self):
+        Category.cached()
+        # Otro worker cambio la categoria sin pasar por este proceso
+        Category.objects.filter(pk=self.category.pk).update(name="Tango")
+        cache.set("reference:categories:version", "otra", None)
+
+        self.assertEqual(Category.cached()[self.category.pk].name, "Tango")
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from app import scheduler
+from app.models import Category, Event, IdempotencyKey, ScheduledJob, User, Venue
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizador", password="password123")
+        category = Category.objects.create(name="Música")
+        venue = Venue.objects.create(name="Estadio", city="La Plata", address="Av. 32", capacity=1000, contact="x")
+
+        def event(days, state):
+            return Event.objects.create(
+                title=f"Evento {state} {days}",
+                description="Descripcion",
+                scheduled_at=timezone.now() + timedelta(days=days),
+                organizer=organizer,
+                category=category,
+                venue=venue,
+                state=state,
+            )
+
+        self.past = event(-1, "AVAILABLE")
+        self.past_sold_out = event(-2, "SOLD_OUT")
+        self.past_cancelled = event(-1, "CANCELLED")
+        self.future = event(1, "AVAILABLE")
+
+    def test_finish_elapsed_only_touches_past_active_events(self):
+        self.assertEqual(Event.finish_elapsed(), 2)
+
+        states = dict(Event.objects.values_list("pk", "state"))
+        self.assertEqual(states[self.past.pk], "FINISHED")
+        self.assertEqual(states[self.past_sold_out.pk], "FINISHED")
+        self.assertEqual(states[self.past_cancelled.pk], "CANCELLED")
+        self.assertEqual(states[self.future.pk], "AVAILABLE")
+        self.assertEqual(Event.finish_elapsed(), 0)
+
+    def test_only_one_worker_runs_a_job_per_interval(self):
+        self.assertEqual(scheduler.run_job("finish_elapsed_events", owner="worker-1"), 2)
+        # Otro worker (o el mismo) no la vuelve a correr hasta el proximo intervalo
+        self.assertIsNone(scheduler.run_job("finish_elapsed_events", owner="worker-2"))
+
+        job = ScheduledJob.objects.get(name="finish_elapsed_events")
+        self.assertEqual((job.runs, job.last_result, job.total_result, job.owner), (1, 2, 2, "worker-1"))
+        self.assertGreater(job.next_run_at, timezone.now() + timedelta(seconds=50))
+
+        ScheduledJob.objects.filter(name="finish_elapsed_events").update(next_run_at=timezone.now())
+        self.assertEqual(scheduler.run_job("finish_elapsed_events", owner="worker-2"), 0)
+        self.assertEqual(ScheduledJob.objects.get(name="finish_elapsed_events").runs, 2)
+
+    def test_failed_runs_are_recorded_and_released(self):
+        def broken():
+            raise RuntimeError("sin base")
+
+        original = scheduler.JOBS["finish_elapsed_events"]
+        scheduler.JOBS["finish_elapsed_events"] = (broken, 60)
+        try:
+            self.assertIsNone(scheduler.run_job("finish_elapsed_events", owner="worker-1"))
+        finally:
+            scheduler.JOBS["finish_elapsed_events"] = original
+
+        job = ScheduledJob.objects.get(name="finish_elapsed_events")
+        self.assertEqual((job.runs, job.failures), (1, 1))
+        self.assertIn("sin base", job.last_error)
+
+    def test_expired_idempotency_keys_are_purged(self):
+        now = timezone.now()
+        user = User.objects.get(username="organizador")
+        IdempotencyKey.objects.create(user=user, key="vencida", expires_at=now - timedelta(hours=1))
+        IdempotencyKey.objects.create(user=user, key="vigente", expires_at=now + timedelta(hours=1))
+
+        self.assertEqual(scheduler.run_job("purge_idempotency_keys", owner="worker-1"), 1)
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["vigente"])
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from app import seed, ticket_codes
+from app.models import Comment, Event, Rating, Ticket, User
+
+
+class SeedTest(TestCase):
+    COUNTS = {
+        "users": 20,
+        "organizers": 2,
+        "categories": 3,
+        "venues": 4,
+        "events": 30,
+        "tickets": 300,
+        "comments": 50,
+        "ratings": 100,
+    }
+
+    def test_generates_consistent_rows(self):
+        seed.generate(seed=7, batch_size=64, **self.COUNTS)
+
+        self.assertEqual(User.objects.filter(username__startswith=seed.PREFIX).count(), 22)
+        self.assertEqual(Ticket.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertEqual(Rating.objects.count(), 100)
+        self.assertTrue(all(ticket_codes.is_valid(code) for code in Ticket.objects.values_list("ticket_code", flat=True)))
+        # Los contadores ya coinciden con las filas
+        self.assertEqual(Event.reconcile_inventory(), 0)
+        self.assertEqual(Event.reconcile_ratings(), 0)
+        self.assertFalse(Event.objects.filter(general_sold__gt=F("general_capacity")).exists())
+
+        per_user = Ticket.objects.values("user", "event").annotate(total=Sum("quantity"))
+        self.assertLessEqual(max(row["total"] for row in per_user), Ticket.MAX_PER_USER)
+        self.assertTrue(self.client.login(username=f"{seed.PREFIX}0", password=seed.PASSWORD))
+
+    def test_same_seed_generates_same_data(self):
+        seed.generate(seed=7, **self.COUNTS)
+        first = list(Event.objects.order_by("id").values_list("title", "general_sold", "rating_count"))
+        seed.clear()
+        self.assertFalse(Event.objects.exists())
+
+        seed.generate(seed=7, **self.COUNTS)
+        self.assertEqual(list(Event.objects.order_by("id").values_list("title", "general_sold", "rating_count")), first)
+
+
+
+class FixtureTest(TestCase):
+    def test_events_fixture_loads_with_current_schema(self):
+        call_command("loaddata", settings.BASE_DIR / "fixtures" / "events.json", verbosity=0)
+
+        event = Event.objects.select_related("organizer", "category", "venue").get()
+        self.assertTrue(event.organizer.is_organizer)
+        self.assertEqual((event.category.name, event.venue.city), ("Jazz", "Buenos Aires"))
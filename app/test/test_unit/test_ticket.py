@@ -1,5 +1,10 @@
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
-from app.models import User, Event, Venue, Category, Ticket
+from app import ticket_codes
+from app.models import User, Event, Venue, Category, Ticket, TicketHold
 from django.utils import timezone
 from datetime import timedelta
 from django.db import models
@@ -58,3 +63,229 @@ class TicketModelTest(TestCase):
             if not can_purchase:
                 raise Exception("Límite de compra de tickets alcanzado")
             Ticket.objects.create(user=self.user, event=self.event, quantity=1, type="GENERAL")
+
+    def test_event_sells_out_and_reopens_with_purchases(self):
+        buyers = [User.objects.create_user(username=f"comprador{i}", password="pass") for i in range(4)]
+        Ticket.purchase(buyers[0], self.event, "GENERAL", 4)
+        Ticket.purchase(buyers[1], self.event, "GENERAL", 4)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "AVAILABLE")
+
+        Ticket.purchase(buyers[2], self.event, "GENERAL", 2)
+        last, _ = Ticket.purchase(buyers[3], self.event, "VIP", 4)
+        Ticket.purchase(self.user, self.event, "VIP", 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "SOLD_OUT")
+        self.assertFalse(self.event.can_be_bought())
+
+        last.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "AVAILABLE")
+        self.assertTrue(self.event.can_be_bought())
+
+    def test_editing_stale_event_keeps_it_sold_out(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        self.assertTrue(self.event.reserve_tickets("GENERAL", 10))
+        self.assertTrue(self.event.reserve_tickets("VIP", 5))
+
+        stale.title = "Unit Event editado"
+        stale.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "Unit Event editado")
+        self.assertEqual(self.event.state, "SOLD_OUT")
+        self.assertEqual(stale.state, "SOLD_OUT")
+
+        # Si se amplia la capacidad el evento vuelve a estar a la venta
+        stale.general_capacity = 12
+        stale.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "AVAILABLE")
+
+    def test_cancelled_event_keeps_its_state_when_full(self):
+        Event.objects.filter(pk=self.event.pk).update(state="CANCELLED")
+        self.event.refresh_from_db()
+
+        self.assertTrue(self.event.reserve_tickets("GENERAL", 10))
+        self.assertTrue(self.event.reserve_tickets("VIP", 5))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "CANCELLED")
+
+    def test_purchase_reserves_inventory_and_rejects_oversell(self):
+        buyer = User.objects.create_user(username="buyer", password="pass")
+
+        ticket, errors = Ticket.purchase(buyer, self.event, "VIP", 3)
+        self.assertIsNone(errors)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.vip_sold, 3)
+
+        other = User.objects.create_user(username="other", password="pass")
+        ticket, errors = Ticket.purchase(other, self.event, "VIP", 3)
+        self.assertIsNone(ticket)
+        self.assertIn("Solo quedan 2 entradas", errors["quantity"])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.vip_sold, 3)
+
+    def test_inventory_counters_follow_edits_and_deletes(self):
+        ticket = Ticket.objects.create(user=self.user, event=self.event, quantity=2, type="GENERAL")
+        ticket.quantity = 3
+        ticket.type = "VIP"
+        ticket.save()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.general_sold, self.event.vip_sold), (0, 3))
+
+        ticket.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold(), 0)
+
+    def test_cascade_and_queryset_deletes_release_inventory(self):
+        buyer = User.objects.create_user(username="buyer", password="pass")
+        Ticket.purchase(buyer, self.event, "GENERAL", 2)
+        Ticket.purchase(self.user, self.event, "VIP", 1)
+
+        buyer.delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.general_sold, self.event.vip_sold), (0, 1))
+
+        Ticket.objects.filter(event=self.event).delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold(), 0)
+
+    def test_deleting_a_buyer_reopens_a_sold_out_event(self):
+        buyer = User.objects.create_user(username="buyer", password="pass")
+        holder = User.objects.create_user(username="holder", password="pass")
+        Event.objects.filter(pk=self.event.pk).update(general_capacity=2, vip_capacity=1)
+        self.event.refresh_from_db()
+        Ticket.purchase(buyer, self.event, "GENERAL", 2)
+        TicketHold.reserve(holder, self.event, "VIP", 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.state, "SOLD_OUT")
+
+        buyer.delete()
+        holder.delete()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.tickets_sold(), self.event.state), (0, "AVAILABLE"))
+        self.assertTrue(self.event.can_be_bought())
+
+    def test_reconcile_inventory_command_rebuilds_counters(self):
+        Ticket.objects.create(user=self.user, event=self.event, quantity=2, type="GENERAL")
+        Ticket.objects.create(user=self.user, event=self.event, quantity=1, type="VIP")
+        Event.objects.filter(pk=self.event.pk).update(general_sold=9, vip_sold=0)
+
+        out = StringIO()
+        call_command("reconcile_inventory", stdout=out)
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.general_sold, self.event.vip_sold), (2, 1))
+        self.assertIn("Eventos corregidos: 1", out.getvalue())
+
+    def test_allocated_codes_are_unique_and_checksummed(self):
+        codes = Ticket.allocate_codes(500)
+        self.assertEqual(len(set(codes)), 500)
+        self.assertTrue(all(ticket_codes.is_valid(code) for code in codes))
+
+        ticket = Ticket.objects.create(user=self.user, event=self.event, quantity=1, type="GENERAL")
+        self.assertNotIn(ticket.ticket_code, codes)
+        self.assertTrue(ticket_codes.is_valid(ticket.ticket_code))
+
+        typo = ("1" if codes[0][3] != "1" else "2").join([codes[0][:3], codes[0][4:]])
+        self.assertFalse(ticket_codes.is_valid(typo))
+
+    def test_failed_save_drops_the_rolled_back_code(self):
+        # El codigo sale de la secuencia dentro de la transaccion que se deshace:
+        # un reintento no puede reusarlo porque otro ticket puede recibir el mismo numero
+        ticket = Ticket(user=self.user, event=self.event, quantity=11, type="GENERAL")
+        with self.assertRaises(ValidationError):
+            ticket.save()
+        self.assertEqual(ticket.ticket_code, "")
+        self.assertIsNone(ticket.pk)
+
+    def test_issue_bulk_reports_each_row(self):
+        User.objects.create_user(username="sponsor", password="pass")
+        results = Ticket.issue_bulk(self.event, [
+            ("sponsor", "GENERAL", "6"),
+            ("sponsor", "vip", "2"),
+            ("nobody", "GENERAL", "1"),
+            ("sponsor", "VIP", "4"),
+            ("sponsor", "GENERAL", "x"),
+        ])
+
+        # Las 5 VIP alcanzan para la fila de 2 pero no para la de 4
+        self.assertEqual(
+            [result["error"] is None for result in results], [True, True, False, False, False]
+        )
+        self.assertEqual(results[2]["error"], "No existe un usuario con ese nombre.")
+        self.assertIn("Solo quedan 3", results[3]["error"])
+        self.assertEqual(Ticket.objects.get(ticket_code=results[0]["ticket_code"]).quantity, 6)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.general_sold, self.event.vip_sold), (6, 2))
+
+    def test_issue_bulk_rejects_events_that_cannot_be_bought(self):
+        User.objects.create_user(username="sponsor", password="pass")
+        self.event.state = "FINISHED"
+
+        results = Ticket.issue_bulk(self.event, [("sponsor", "GENERAL", "2")])
+
+        self.assertEqual(results[0]["error"], "El evento está Finalizado.")
+        self.assertFalse(Ticket.objects.exists())
+
+
+class TicketHoldModelTest(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.user = User.objects.create_user(username="holduser", password="pass")
+        self.event = Event.objects.create(
+            title="Hold Event",
+            description="Evento con reservas",
+            scheduled_at=timezone.now() + timedelta(days=10),
+            organizer=self.organizer,
+            category=Category.objects.create(name="Teatro"),
+            venue=Venue.objects.create(name="Sala", city="La Plata", address="Calle 1", capacity=50, contact="x"),
+            general_capacity=5,
+            vip_capacity=2,
+        )
+
+    def test_reserve_takes_inventory_and_confirm_turns_it_into_ticket(self):
+        hold, errors = TicketHold.reserve(self.user, self.event, "VIP", 2)
+        self.assertIsNone(errors)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.vip_sold, 2)
+
+        other = User.objects.create_user(username="other", password="pass")
+        _, errors = TicketHold.reserve(other, self.event, "VIP", 1)
+        self.assertEqual(errors["quantity"], "No hay mas cupo disponible.")
+
+        ticket, errors = hold.confirm()
+        self.assertIsNone(errors)
+        self.assertEqual(ticket.quantity, 2)
+        self.assertFalse(TicketHold.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.vip_sold, 2)
+
+    def test_release_expired_returns_inventory(self):
+        for _ in range(2):
+            TicketHold.reserve(self.user, self.event, "GENERAL", 2)
+        TicketHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        hold = TicketHold.objects.first()
+
+        self.assertEqual(TicketHold.release_expired(batch_size=1), 2)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.general_sold, 0)
+        _, errors = hold.confirm()
+        self.assertIn("hold", errors)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.general_sold, 0)
+
+    def test_hold_on_a_cancelled_event_is_released_instead_of_confirmed(self):
+        hold, _ = TicketHold.reserve(self.user, self.event, "VIP", 2)
+        Event.objects.filter(pk=self.event.pk).update(state="CANCELLED")
+
+        ticket, errors = hold.confirm()
+
+        self.assertIsNone(ticket)
+        self.assertEqual(errors["event"], "No se puede realizar la compra porque el evento está Cancelado.")
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(TicketHold.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.vip_sold, self.event.state), (0, "CANCELLED"))
@@ -0,0 +1,81 @@
+"""Codigos de ticket unicos, no adivinables y con digito verificador.
+
+Cada codigo sale de un numero de secuencia (TicketCodeSequence) que se permuta con
+una red de Feistel de 50 bits usando una clave secreta, asi que dos numeros
+distintos nunca dan el mismo codigo pero los codigos consecutivos no se pueden
+adivinar. Se escribe en base32 de Crockford (10 caracteres) mas un caracter
+verificador Luhn mod 32 que detecta errores de tipeo.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE = len(ALPHABET)
+PAYLOAD_LENGTH = 10
+HALF_BITS = 25
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUNDS = 4
+MAX_VALUE = 1 << (2 * HALF_BITS)
+
+
+@lru_cache(maxsize=1)
+def _round_hashers():
+    """Un hash con clave por ronda, para copiarlo en vez de recalcular la clave"""
+    secret = getattr(settings, "TICKET_CODE_SECRET", None) or settings.SECRET_KEY
+    key = hashlib.blake2b(secret.encode(), digest_size=32, person=b"ticket-codes").digest()
+    return [
+        hashlib.blake2b(bytes([round_number]), digest_size=4, key=key)
+        for round_number in range(ROUNDS)
+    ]
+
+
+# Lo que suma al Luhn un digito en posicion duplicada, precalculado para los 32 valores
+_DOUBLED = [(2 * digit) // BASE + (2 * digit) % BASE for digit in range(BASE)]
+_VALUES = {char: digit for digit, char in enumerate(ALPHABET)}
+
+
+def _check_char(digits):
+    """digits va del menos significativo al mas significativo: se duplican las
+    posiciones pares empezando por la derecha del codigo"""
+    total = sum(_DOUBLED[digit] for digit in digits[::2]) + sum(digits[1::2])
+    return ALPHABET[-total % BASE]
+
+
+def encode(value):
+    """Convierte un numero de secuencia en un codigo de ticket"""
+    return encode_many([value])[0]
+
+
+def encode_many(values):
+    """Como encode, para muchos numeros a la vez (bulk_create, seed): las claves de las
+    rondas se buscan una sola vez en vez de una vez por codigo"""
+    hashers = _round_hashers()
+    codes = []
+    for value in values:
+        if not 0 <= value < MAX_VALUE:
+            raise ValueError("Numero de secuencia fuera de rango para un codigo de ticket")
+
+        # Red de Feistel: cada ronda mezcla una mitad con el hash de la otra
+        left, right = value >> HALF_BITS, value & HALF_MASK
+        for hasher in hashers:
+            round_hash = hasher.copy()
+            round_hash.update(right.to_bytes(4, "big"))
+            left, right = right, left ^ (int.from_bytes(round_hash.digest(), "big") & HALF_MASK)
+        permuted = (left << HALF_BITS) | right
+
+        digits = []
+        for _ in range(PAYLOAD_LENGTH):
+            permuted, digit = divmod(permuted, BASE)
+            digits.append(digit)
+        codes.append("".join([ALPHABET[digit] for digit in reversed(digits)]) + _check_char(digits))
+    return codes
+
+
+def is_valid(code):
+    """Verifica el caracter de control de un codigo generado por encode"""
+    code = (code or "").upper()
+    if len(code) != PAYLOAD_LENGTH + 1 or any(char not in ALPHABET for char in code):
+        return False
+    return _check_char([_VALUES[char] for char in reversed(code[:-1])]) == code[-1]
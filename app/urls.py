@@ -2,9 +2,11 @@ from django.contrib.auth.views import LogoutView
 from django.urls import path
 
 from . import views
+from .metrics import metrics_view
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("metrics", metrics_view, name="metrics"),
     path("accounts/register/", views.register, name="register"),
     path("accounts/logout/", LogoutView.as_view(), name="logout"),
     path("accounts/login/", views.login_view, name="login"),
@@ -13,7 +15,10 @@ urlpatterns = [
     path("events/<int:id>/edit/", views.event_form, name="event_edit"),
     path("events/<int:id>/", views.event_detail, name="event_detail"),
     path("events/<int:id>/delete/", views.event_delete, name="event_delete"),
+    path("events/archive/", views.archived_events, name="archived_events"),
+    path("events/archive/<int:id>/", views.archived_event_detail, name="archived_event_detail"),
     path('events/<int:event_id>/comments/', views.create_comment, name='create_comment'),
+    path("events/<int:event_id>/comments/page/", views.event_comments, name="event_comments"),
     path("comments/<int:comment_id>/edit/", views.edit_comment, name="edit_comment"),
     path("comments/<int:comment_id>/delete/", views.delete_comment, name="delete_comment"),
     path("comments/list/", views.comment_list, name="comment_list"),
@@ -36,6 +41,10 @@ urlpatterns = [
     path("venue/<int:venue_id>/delete/", views.delete_venue, name="delete_venue"),
     # Rutas para los tickets 
     path("ticket/create/<int:event_id>", views.ticket_form, name="ticket_form"),
+    path("events/<int:event_id>/tickets/bulk/", views.ticket_bulk_issue, name="ticket_bulk_issue"),
+    path("ticket/queue/<int:event_id>/", views.waiting_room_status, name="waiting_room_status"),
+    path("ticket/hold/<int:id>/", views.ticket_hold, name="ticket_hold"),
+    path("ticket/hold/<int:id>/release/", views.ticket_hold_release, name="ticket_hold_release"),
     path("ticket/edit/<int:id>/", views.ticket_form, name="ticket_edit"),
     path("ticket/<int:id>/", views.ticket_detail, name="ticket_detail"),
     path("ticket/<int:id>/delete/", views.ticket_delete, name="ticket_delete"),
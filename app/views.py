@@ -1,16 +1,27 @@
+import csv
 import datetime
+import io
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
-from .models import Event, User, Ticket
+from .models import ArchivedEvent, Event, User, Ticket, TicketHold
 from .models import Comment, Category, Rating, Venue
+from . import event_search
+from .idempotency import idempotent
+from .pagination import keyset_page
+from .waiting_room import check_admission, waiting_room_required
 
 
+EVENTS_PAGE_SIZE = 25
+THREAD_PAGE_SIZE = 10
+
 
 def register(request):
     if request.method == "POST":
@@ -65,18 +76,90 @@ def home(request):
 
 @login_required
 def events(request):
-    now = timezone.now()
-    events = Event.objects.filter(scheduled_at__gt=now).order_by("scheduled_at")
+    filters = parse_event_filters(request.GET)
+    upcoming, facets = Event.search(**filters)
+    # Por calificacion si se pide; si no, con texto por relevancia y sin texto por fecha
+    sort = request.GET.get("sort")
+    if sort == "rating":
+        ordering = ("-rating_average", "-rating_count", "-id")
+    elif filters["text"]:
+        ordering = ("search_rank", "id")
+    else:
+        ordering = ("scheduled_at", "id")
+    upcoming = upcoming.order_by(*ordering)
+
+    cursor = request.GET.get("after")
+    events, next_cursor = keyset_page(upcoming, cursor, EVENTS_PAGE_SIZE)
+    # Categoria y recinto desde el cache de datos de referencia en vez de un JOIN
+    categories, venues = Category.cached(), Venue.cached()
+    for event in events:
+        event.category = categories.get(event.category_id) or event.category
+        event.venue = venues.get(event.venue_id) or event.venue
+
+    # Los links de paginacion conservan los filtros
+    query = request.GET.copy()
+    query.pop("after", None)
     return render(
         request,
         "app/events.html",
-        {"events": events, "user_is_organizer": request.user.is_organizer},
+        {
+            "events": events,
+            "next_cursor": next_cursor,
+            "is_first_page": not cursor,
+            "filters": filters,
+            "filter_query": query.urlencode(),
+            "facets": facets,
+            "sort": sort,
+            "states": Event.EVENT_STATE,
+            "user_is_organizer": request.user.is_organizer,
+        },
     )
 
 
+def parse_event_filters(params):
+    """Lee los filtros del listado de eventos del query string. Los valores invalidos
+    se ignoran."""
+    filters = {"category": None, "city": None, "date_from": None, "date_to": None, "state": None, "text": None}
+
+    try:
+        filters["category"] = int(params["category"])
+    except (KeyError, ValueError):
+        pass
+
+    filters["city"] = params.get("city", "").strip() or None
+    filters["text"] = " ".join(event_search.words(params.get("q"))) or None
+
+    for name, param, offset in (("date_from", "from", 0), ("date_to", "to", 1)):
+        try:
+            day = datetime.date.fromisoformat(params[param]) + datetime.timedelta(days=offset)
+            filters[name] = timezone.make_aware(datetime.datetime.combine(day, datetime.time()))
+        except (KeyError, ValueError):
+            pass
+
+    if params.get("state") in dict(Event.EVENT_STATE):
+        filters["state"] = params["state"]
+
+    return filters
+
+
 @login_required
 def event_detail(request, id):
-    event = get_object_or_404(Event, pk=id)
+    # Todo lo que muestra la pagina en un numero fijo de consultas, sin importar
+    # cuantos comentarios y calificaciones tenga el evento
+    try:
+        event = get_object_or_404(
+            Event.objects.select_related("organizer", "venue", "category").annotate(
+                comments_count=related_count(Comment),
+            ),
+            pk=id,
+        )
+    except Http404:
+        # Si ya se archivo, el organizador lo sigue viendo desde el archivo
+        if ArchivedEvent.objects.filter(pk=id, organizer=request.user).exists():
+            return redirect("archived_event_detail", id=id)
+        raise
+    comments, comments_cursor = comments_page(event)
+    ratings, ratings_cursor = ratings_page(event)
     cuenta_regresiva = None
     now = timezone.now()
     if not request.user.is_organizer:
@@ -87,10 +170,79 @@ def event_detail(request, id):
     
     return render(
             request, "app/event_detail.html",
-            {"event": event, "cuenta_regresiva": cuenta_regresiva}
+            {
+                "event": event,
+                "cuenta_regresiva": cuenta_regresiva,
+                "comments": comments,
+                "comments_cursor": comments_cursor,
+                "ratings": ratings,
+                "ratings_cursor": ratings_cursor,
+            }
             )
 
 
+def related_count(model):
+    """Cantidad de filas de model (por ejemplo comentarios) del evento, para annotate"""
+    rows = (
+        model.objects.filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def comments_page(event, cursor=None):
+    """Una pagina de comentarios del evento, del mas nuevo al mas viejo"""
+    comments = event.comments.select_related("user").order_by("-created_at", "-id")
+    return keyset_page(comments, cursor, THREAD_PAGE_SIZE)
+
+
+def ratings_page(event, cursor=None):
+    """Una pagina de calificaciones del evento, de la mas nueva a la mas vieja"""
+    ratings = event.ratings.select_related("user").order_by("-created_at", "-id")
+    return keyset_page(ratings, cursor, THREAD_PAGE_SIZE)
+
+
+@login_required
+def event_comments(request, event_id):
+    """Fragmento HTML con la pagina de comentarios siguiente a ?after="""
+    event = get_object_or_404(Event, pk=event_id)
+    comments, next_cursor = comments_page(event, request.GET.get("after"))
+    return render(
+        request,
+        "app/comment_page.html",
+        {"event": event, "comments": comments, "comments_cursor": next_cursor},
+    )
+
+
+@login_required
+def archived_events(request):
+    """Eventos archivados del organizador, del mas reciente al mas viejo"""
+    if not request.user.is_organizer:
+        return redirect("events")
+
+    archived = (
+        ArchivedEvent.objects.filter(organizer=request.user)
+        .defer("description", "data")
+        .order_by("-scheduled_at", "-id")
+    )
+    cursor = request.GET.get("after")
+    events, next_cursor = keyset_page(archived, cursor, EVENTS_PAGE_SIZE)
+    return render(
+        request,
+        "app/archived_events.html",
+        {"events": events, "next_cursor": next_cursor, "is_first_page": not cursor},
+    )
+
+
+@login_required
+def archived_event_detail(request, id):
+    event = get_object_or_404(ArchivedEvent, pk=id, organizer=request.user)
+    return render(request, "app/archived_event_detail.html", {"event": event})
+
+
 @login_required
 def event_delete(request, id):
     user = request.user
@@ -116,8 +268,8 @@ def event_form(request, id = None):
     if not user.is_organizer:
         return redirect("events")
 
-    categorias = Category.objects.all()
-    venues = Venue.objects.all()
+    categorias = Category.cached().values()
+    venues = Venue.cached().values()
 
     if id is not None:
         event = get_object_or_404(Event, pk=id)
@@ -238,17 +390,19 @@ def delete_comment(request, comment_id):
     
 @login_required
 def comment_list(request):
-    comments = Comment.objects.all()
+    comments = Comment.objects.select_related("event", "user")
     return render(request, "app/comment_list.html", {"comments": comments})
 
 @login_required
 def ticket_list(request):
     # Obtener solo los tickets del usuario logueado
-    tickets = Ticket.objects.filter(user=request.user)
+    tickets = Ticket.objects.filter(user=request.user).select_related("event")
     return render(request, 'app/ticket_list.html', {'tickets': tickets})
 
 # View para crear o editar un ticket
 @login_required
+@idempotent
+@waiting_room_required
 def ticket_form(request, event_id=None, id=None):
     ticket = None
     event = None
@@ -261,7 +415,14 @@ def ticket_form(request, event_id=None, id=None):
     elif event_id:
         event = get_object_or_404(Event, pk=event_id)
 
-    if not event.can_be_bought():
+    # Agotado se resuelve con el estado, sin contar tickets. Si se agoto mientras el
+    # usuario completaba el formulario se le muestra el error de cupo en el formulario.
+    # Una compra existente se puede seguir modificando: el cupo lo controla Ticket.purchase
+    if event.state == "SOLD_OUT" and ticket is None and request.method == "POST":
+        messages.error(request, "No hay mas cupo disponible.")
+        return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+
+    if not event.can_be_bought() and not (ticket and event.state == "SOLD_OUT"):
         messages.error(request, f"No se puede realizar la compra porque el evento está {event.get_state_display()}.")
         return redirect("events")
 
@@ -283,81 +444,118 @@ def ticket_form(request, event_id=None, id=None):
             messages.error(request, "La cantidad ingresada no es válida.")
             return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
 
-        if quantity <= 0:
-            messages.error(request, "La cantidad debe ser mayor a cero.")
-            return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+        # Primer paso de la compra en dos pasos: reserva el cupo y el pago se hace en la
+        # pagina de la reserva, sin que otro comprador se lleve las entradas mientras tanto
+        if ticket is None and request.POST.get("action") == "reserve":
+            hold, errors = TicketHold.reserve(request.user, event, type_input, quantity)
+            if errors:
+                for error in errors.values():
+                    messages.error(request, error)
+                return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+            minutes = int(TicketHold.hold_duration().total_seconds() // 60)
+            messages.success(request, f"Tus entradas quedan reservadas por {minutes} minutos.")
+            return redirect("ticket_hold", id=hold.id)
+
+        # Crear o actualizar ticket reservando el cupo en una sola transaccion
+        is_edit = ticket is not None
+        _, errors = Ticket.purchase(request.user, event, type_input, quantity, ticket)
 
-        # Validar el tipo de entrada
-        if type_input == "VIP":
-            capacity = event.vip_capacity
-        elif type_input == "GENERAL":
-            capacity = event.general_capacity
-        else:
-            messages.error(request, "Tipo de entrada no válido.")
+        if errors:
+            for error in errors.values():
+                messages.error(request, error)
             return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
 
-        # Tickets ya vendidos por tipo (excluyendo el ticket actual si se está editando)
-        total_tickets_sold = Ticket.objects.filter(event=event, type=type_input)
-        if ticket:
-            total_tickets_sold = total_tickets_sold.exclude(pk=ticket.pk)
-
-        total_sold = total_tickets_sold.aggregate(total=Sum('quantity'))['total'] or 0
-        available = capacity - total_sold
-
-        if available < 0:
-            available = 0
+        if is_edit:
+            messages.success(request, "Se modificó la compra con éxito.")
+        else:
+            messages.success(request, "Se realizó la compra con éxito.")
 
-        if available == 0:
-            messages.error(request, "No hay mas cupo disponible.")
-            return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+        return redirect("ticket_list")
 
-        if quantity > available:
-            messages.error(request, f"No hay suficiente cupo disponible para este tipo de entrada. Solo quedan {available} entradas.")
-            return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+    return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
 
-        # ✅ Validación de máximo 4 entradas por usuario
-        if ticket:
-            existing_tickets = Ticket.objects.filter(user=request.user, event=event).exclude(pk=ticket.pk)
-        else:
-            existing_tickets = Ticket.objects.filter(user=request.user, event=event)
+# View para pagar una reserva de entradas (segundo paso de la compra)
+@login_required
+@idempotent
+def ticket_hold(request, id):
+    hold = get_object_or_404(TicketHold.objects.select_related("event"), pk=id, user=request.user)
+    event = hold.event
 
-        total_quantity_user = sum(t.quantity for t in existing_tickets)
+    if hold.is_expired():
+        messages.error(request, "La reserva venció. Volvé a intentar la compra.")
+        return redirect("event_detail", id=event.id)
 
-        if total_quantity_user + quantity > 4:
-            messages.error(request, f"No podés comprar más de 4 entradas para este evento. Ya tenés {total_quantity_user}.")
-            return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+    if request.method == "POST":
+        _, errors = hold.confirm()
+        if errors:
+            for error in errors.values():
+                messages.error(request, error)
+            return redirect("event_detail", id=event.id)
+        messages.success(request, "Se realizó la compra con éxito.")
+        return redirect("ticket_list")
 
-        # Crear o actualizar ticket
-        if ticket:
-            ticket.quantity = quantity
-            ticket.type = type_input
-            ticket.save()
-            messages.success(request, "Se modificó la compra con éxito.")
-        else:
-            ticket = Ticket.objects.create(
-                quantity=quantity,
-                type=type_input,
-                user=request.user,
-                event=event
-            )
-            messages.success(request, "Se realizó la compra con éxito.")
+    return render(request, "app/ticket_form.html", {"ticket": None, "event": event, "hold": hold})
 
-        return redirect("ticket_list")
+# View para cancelar una reserva y devolver las entradas
+@login_required
+def ticket_hold_release(request, id):
+    hold = get_object_or_404(TicketHold, pk=id, user=request.user)
+    if request.method == "POST":
+        hold.release()
+        messages.success(request, "Se canceló la reserva.")
+    return redirect("event_detail", id=hold.event_id)
 
-    return render(request, "app/ticket_form.html", {"ticket": ticket, "event": event})
+# View para que el organizador emita tickets en cantidad (sponsors, grupos)
+@login_required
+def ticket_bulk_issue(request, event_id):
+    event = get_object_or_404(Event, pk=event_id)
 
-def update_state_based_on_capacity(self):
-    if self.is_full():
-        self.state = "SOLD_OUT"
-    else:
-        self.state = "AVAILABLE"
-    self.save()
+    if event.organizer != request.user:
+        messages.error(request, "Solo el organizador del evento puede emitir tickets.")
+        return redirect("events")
 
+    results, error = None, None
+    if not event.can_be_bought():
+        error = f"No se pueden emitir tickets porque el evento está {event.get_state_display()}."
+    elif request.method == "POST":
+        uploaded = request.FILES.get("csv_file")
+        text = request.POST.get("rows", "")
+        if uploaded:
+            try:
+                # utf-8-sig descarta el BOM que agregan algunas planillas al exportar
+                text = uploaded.read().decode("utf-8-sig")
+            except UnicodeDecodeError:
+                error = "El archivo tiene que estar guardado como CSV UTF-8."
+
+        if error is None:
+            rows = [row for row in csv.reader(io.StringIO(text)) if row]
+            if rows and is_bulk_header(rows[0]):
+                rows = rows[1:]
+            results = Ticket.issue_bulk(event, rows)
+            issued = sum(1 for result in results if result["error"] is None)
+            if issued:
+                messages.success(request, f"Se emitieron {issued} tickets.")
+            if issued < len(results):
+                messages.error(request, f"{len(results) - issued} filas no se pudieron emitir.")
+
+    return render(request, "app/ticket_bulk.html", {"event": event, "results": results, "error": error})
+
+def is_bulk_header(row):
+    """Si la fila es el encabezado que exportan las planillas (usuario,tipo,cantidad):
+    ni el tipo es un tipo de entrada ni la cantidad un numero"""
+    type, quantity = (list(row) + ["", ""])[1:3]
+    return type.strip().upper() not in Event.INVENTORY_FIELDS and not quantity.strip().isdigit()
+
+# Consulta de la sala de espera, la usa la pagina de espera para saber si ya entro
+@login_required
+def waiting_room_status(request, event_id):
+    admitted, position = check_admission(request, event_id)
+    return JsonResponse({"admitted": admitted, "position": position})
 
 # View para ver el detalle de un ticket
 @login_required
 def ticket_detail(request, id):
-    ticket = get_object_or_404(Ticket, pk=id, user=request.user)
+    ticket = get_object_or_404(Ticket.objects.select_related("event"), pk=id, user=request.user)
     return render(request, "app/ticket_detail.html", {"ticket": ticket})
 
 # View para eliminar tickets
@@ -578,12 +776,13 @@ def delete_rating(request, rating_id):
 
 @login_required
 def rating_list_event(request,event_id):
+    """Fragmento HTML con la pagina de calificaciones siguiente a ?after="""
     specificEvent = get_object_or_404(Event,pk=event_id)
-    ratings = Rating.objects.filter(event=specificEvent)
+    ratings, next_cursor = ratings_page(specificEvent, request.GET.get("after"))
     return render(
         request,
         "app/listaRatings.html",
-        {"ratings": ratings})
+        {"event": specificEvent, "ratings": ratings, "ratings_cursor": next_cursor})
 
 
 @login_required
@@ -630,7 +829,7 @@ def create_venue(request):
 
 @login_required
 def venue_list(request):
-    venues = Venue.objects.all()
+    venues = Venue.cached().values()
     return render(request, "app/ListVenue.html" ,  {"venues": venues, "user_is_organizer": request.user.is_organizer},)
     
 
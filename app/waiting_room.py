@@ -0,0 +1,156 @@
+"""Sala de espera virtual para la compra de entradas de eventos muy pedidos.
+
+Limita cuantos compradores por evento pueden estar en el formulario de compra al
+mismo tiempo (WAITING_ROOM_CONCURRENCY). El resto saca un numero y espera su turno
+en orden de llegada. El estado vive en el cache de Django, asi que con varios
+workers hace falta un cache compartido entre procesos.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+SESSION_KEY = "waiting_room"
+
+
+class WaitingRoom:
+    """Cola FIFO de admision de un evento.
+
+    Cada comprador saca un numero (`issued`) y solo el que esta al frente de la cola
+    (`served`) puede ocupar uno de los lugares de compra. Cada lugar es una clave del
+    cache con vencimiento, asi que quien abandona la compra lo libera solo. Los que
+    abandonan la cola se saltean cuando deja de llegar su heartbeat."""
+
+    def __init__(self, event_id, concurrency=None):
+        self.event_id = event_id
+        self.concurrency = settings.WAITING_ROOM_CONCURRENCY if concurrency is None else concurrency
+        self.admission_seconds = settings.WAITING_ROOM_ADMISSION_SECONDS
+        self.heartbeat_seconds = settings.WAITING_ROOM_HEARTBEAT_SECONDS
+
+    @property
+    def enabled(self):
+        return self.concurrency > 0
+
+    def _key(self, *parts):
+        return ":".join([SESSION_KEY, str(self.event_id), *map(str, parts)])
+
+    def _counter(self, name, initial):
+        key = self._key(name)
+        cache.add(key, initial, timeout=None)
+        return key
+
+    def _heartbeat(self, number):
+        cache.set(self._key("alive", number), 1, timeout=self.heartbeat_seconds)
+
+    def _advance(self, head):
+        """Pasa el frente de la cola al siguiente numero, una sola vez por numero"""
+        if cache.add(self._key("advanced", head), 1, timeout=self.admission_seconds):
+            cache.incr(self._key("served"))
+
+    def head(self):
+        return cache.get(self._counter("served", 1))
+
+    def join(self):
+        """Saca un numero nuevo en la cola"""
+        number = cache.incr(self._counter("issued", 0))
+        self._heartbeat(number)
+        return number
+
+    def position(self, number):
+        """Cuantos compradores hay adelante. Es negativo si el numero ya fue salteado."""
+        return number - self.head()
+
+    def admit(self, number):
+        """Intenta admitir al comprador con ese numero. Devuelve el lugar ocupado o
+        None si todavia tiene que esperar."""
+        self._heartbeat(number)
+
+        head = self.head()
+        while head < number and cache.get(self._key("alive", head)) is None:
+            self._advance(head)
+            head = self.head()
+
+        if head != number:
+            return None
+
+        for slot in range(self.concurrency):
+            if cache.add(self._key("slot", slot), number, timeout=self.admission_seconds):
+                self._advance(number)
+                return slot
+        return None
+
+    def is_admitted(self, number, slot):
+        return cache.get(self._key("slot", slot)) == number
+
+    def leave(self, number, slot):
+        """Libera el lugar de compra para el siguiente en la cola"""
+        if self.is_admitted(number, slot):
+            cache.delete(self._key("slot", slot))
+
+
+def check_admission(request, event_id):
+    """Admite o encola la sesion del usuario para el evento.
+
+    Devuelve (admitido, posicion en la cola)."""
+    room = WaitingRoom(event_id)
+    if not room.enabled:
+        return True, 0
+
+    entries = request.session.get(SESSION_KEY, {})
+    number, slot = entries.get(str(event_id), (None, None))
+
+    if slot is not None and room.is_admitted(number, slot):
+        return True, 0
+
+    if number is None or room.position(number) < 0:
+        number = room.join()
+
+    previous = entries.get(str(event_id))
+    slot = room.admit(number)
+    if previous is None or list(previous) != [number, slot]:
+        entries[str(event_id)] = [number, slot]
+        request.session[SESSION_KEY] = entries
+
+    if slot is None:
+        return False, room.position(number)
+    return True, 0
+
+
+def release_admission(request, event_id):
+    entries = request.session.get(SESSION_KEY, {})
+    entry = entries.pop(str(event_id), None)
+    if entry is None:
+        return
+    if entry[1] is not None:
+        WaitingRoom(event_id).leave(*entry)
+    request.session[SESSION_KEY] = entries
+
+
+def waiting_room_required(view):
+    """Pone la sala de espera delante de una vista de compra que recibe event_id.
+    Cuando la vista redirige (compra hecha o rechazada) se libera el lugar."""
+
+    @wraps(view)
+    def wrapper(request, *args, event_id=None, **kwargs):
+        if event_id is None or not WaitingRoom(event_id).enabled:
+            return view(request, *args, event_id=event_id, **kwargs)
+
+        admitted, position = check_admission(request, event_id)
+        if not admitted:
+            return render(
+                request,
+                "app/waiting_room.html",
+                {
+                    "event_id": event_id,
+                    "position": position,
+                    "poll_seconds": max(settings.WAITING_ROOM_HEARTBEAT_SECONDS // 3, 1),
+                },
+            )
+
+        response = view(request, *args, event_id=event_id, **kwargs)
+        if response.status_code == 302:
+            release_admission(request, event_id)
+        return response
+
+    return wrapper